@@ -0,0 +1,7 @@
+-- events created by clustering, a full clustering run replaces them
+ALTER TABLE event ADD COLUMN generated boolean not null default false;
+
+UPDATE event SET generated = true
+WHERE name LIKE 'Группа новостей %' AND summary IS NULL AND topic_id IS NULL;
+
+CREATE INDEX event_generated_idx ON event (id) WHERE generated;
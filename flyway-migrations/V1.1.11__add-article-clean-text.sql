@@ -0,0 +1,5 @@
+-- plain text of the article without markup and emoji, filled at ingest
+ALTER TABLE article ADD COLUMN clean_text text;
+
+-- articles stored before the column, filled by backfill_clean_text
+CREATE INDEX article_without_clean_text_idx ON article (id) WHERE clean_text IS NULL;
@@ -0,0 +1,9 @@
+-- full-text search over the cleaned text, articles stored before clean_text was filled
+-- fall back to the text without tags; the name is weighted lower as for Telegram
+-- articles it is the name of the channel
+ALTER TABLE article ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('russian', coalesce(clean_text, regexp_replace(article_text, '<[^>]*>', ' ', 'g'))), 'A')
+    || setweight(to_tsvector('russian', article_name), 'B')
+) STORED;
+
+CREATE INDEX article_search_vector_idx ON article USING GIN (search_vector);
@@ -0,0 +1,9 @@
+-- set once an article is linked to an event, so incremental clustering reads
+-- only the unclustered articles instead of anti-joining the whole history
+ALTER TABLE article ADD COLUMN clustered boolean NOT NULL DEFAULT false;
+
+UPDATE article a
+SET clustered = true
+WHERE EXISTS (SELECT 1 FROM article_to_event a2e WHERE a2e.article_id = a.id);
+
+CREATE INDEX article_unclustered_idx ON article (publication_date DESC) WHERE NOT clustered;
@@ -0,0 +1,7 @@
+CREATE TABLE article_features (
+    model_version varchar(100) not null,
+    article_hash varchar(32) not null,
+    vector bytea not null,
+    entities text[] not null,
+    primary key (model_version, article_hash)
+);
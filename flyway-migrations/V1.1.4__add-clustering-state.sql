@@ -0,0 +1,7 @@
+CREATE TABLE event_profile (
+    event_id bigint primary key references event(id),
+    vector_sum bytea not null,
+    entities text[] not null,
+    article_count integer not null,
+    latest_publication_date timestamp
+);
@@ -0,0 +1,24 @@
+-- duplicates could slip through the NOT EXISTS check of concurrent inserts
+CREATE TEMPORARY TABLE article_duplicate AS
+SELECT id, keep_id
+FROM (
+    SELECT id, min(id) OVER (PARTITION BY source_id, article_hash, publication_date) AS keep_id
+    FROM article
+) ranked
+WHERE id <> keep_id;
+
+-- several duplicates of one article can be linked to the same event, so the links
+-- are copied to the kept article once per event instead of being updated in place
+INSERT INTO article_to_event (article_id, event_id)
+SELECT DISTINCT d.keep_id, a2e.event_id
+FROM article_to_event a2e
+JOIN article_duplicate d ON d.id = a2e.article_id
+ON CONFLICT (article_id, event_id) DO NOTHING;
+
+DELETE FROM article_to_event a2e USING article_duplicate d WHERE a2e.article_id = d.id;
+DELETE FROM article a USING article_duplicate d WHERE a.id = d.id;
+
+DROP TABLE article_duplicate;
+
+CREATE UNIQUE INDEX article_source_hash_date_uidx
+    ON article (source_id, article_hash, publication_date) NULLS NOT DISTINCT;
@@ -0,0 +1,14 @@
+-- date-sorted article listing, the listing reads article_text from the heap anyway,
+-- so the index does not include the header columns
+CREATE INDEX article_publication_date_idx ON article (publication_date DESC, id DESC);
+
+CREATE INDEX article_article_hash_idx ON article (article_hash);
+
+-- articles of a source sorted by date, also serves plain source_id lookups
+CREATE INDEX article_source_publication_date_idx ON article (source_id, publication_date DESC);
+
+CREATE INDEX article_to_event_event_id_idx ON article_to_event (event_id);
+
+CREATE INDEX event_topic_id_idx ON event (topic_id);
+
+CREATE INDEX event_profile_latest_publication_date_idx ON event_profile (latest_publication_date);
@@ -0,0 +1,2 @@
+-- id of the newest fetched message, catch-up fetches continue after it
+ALTER TABLE source ADD COLUMN latest_message_id bigint;
@@ -0,0 +1,8 @@
+-- feed of RSS sources and validators of the last fetched response for conditional GET
+ALTER TABLE source
+    ADD COLUMN rss_url varchar(1000),
+    ADD COLUMN rss_etag varchar(1000),
+    ADD COLUMN rss_last_modified varchar(100);
+
+INSERT INTO source(source_key, source_name, rss_url) VALUES
+('kommersant_econ_rss', 'Коммерсант. Экономика (RSS)', 'https://www.kommersant.ru/RSS/section-economics.xml');
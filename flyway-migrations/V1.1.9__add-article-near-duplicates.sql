@@ -0,0 +1,9 @@
+-- MinHash signature of the cleaned text, empty for articles without text to sign
+ALTER TABLE article
+    ADD COLUMN minhash bytea,
+    ADD COLUMN duplicate_of bigint references article(id);
+
+-- articles still waiting to be signed
+CREATE INDEX article_unsigned_idx ON article (id) WHERE minhash IS NULL;
+
+CREATE INDEX article_duplicate_of_idx ON article (duplicate_of) WHERE duplicate_of IS NOT NULL;
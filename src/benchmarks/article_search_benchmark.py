@@ -0,0 +1,135 @@
+"""
+Measure latency of NewsRepository.search_articles on a synthetic corpus.
+
+The benchmark writes to the database configured in .env: it adds a benchmark source with
+--articles synthetic articles and removes both when it finishes. Run it on a local database only.
+
+Usage (from src/):
+    python -m benchmarks.article_search_benchmark --articles 1000000
+"""
+import argparse
+import io
+import random
+import time
+from datetime import datetime, timedelta
+import numpy as np
+
+from news_db.news_repository import NewsRepository
+
+
+SYLLABLES = [consonant + vowel for consonant in 'бвгдзклмнпрстфхцчшщж' for vowel in 'аеиоуыэюяё']
+ENDINGS = ['', 'а', 'ов', 'ами', 'ой', 'ые', 'ого', 'ить', 'ует']
+# the most frequent words of a text are stop words, the russian configuration does not index them
+STOP_WORDS = ('и в не на что он с как а то все она так его но да к у же за бы по только ее было вот от еще нет '
+              'о из ему когда даже ну ли если уже или ни быть был до опять уж вам ведь там потом может они тут '
+              'где есть надо для мы их чем была сам без будто чего раз тоже под будет тогда кто этот').split()
+
+
+def build_vocabulary(size, rng):
+    """
+    Returns:
+        list: Stop words followed by random stems, the index of a word is its frequency rank
+    """
+    stems = set()
+    while len(stems) < size - len(STOP_WORDS):
+        stems.add(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    stems = sorted(stems)
+    rng.shuffle(stems)
+    return STOP_WORDS + stems
+
+
+def write_articles(news_repository, source_id, article_count, words_per_article, vocabulary, seed):
+    """Load the articles with COPY in chunks of 100k rows."""
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1)
+    with news_repository.get_connection() as conn:
+        with conn.cursor() as cursor:
+            for chunk_start in range(0, article_count, 100000):
+                chunk_end = min(chunk_start + 100000, article_count)
+                # word frequencies follow Zipf's law as in natural language
+                ranks = (np_rng.zipf(1.2, size=(chunk_end - chunk_start, words_per_article)) - 1) % len(vocabulary)
+                buffer = io.StringIO()
+                for k, article_ranks in enumerate(ranks, start=chunk_start):
+                    text = ' '.join(vocabulary[rank] + (rng.choice(ENDINGS) if rank >= len(STOP_WORDS) else '')
+                                    for rank in article_ranks)
+                    date = start + timedelta(seconds=30 * k)
+                    buffer.write(f"benchmark\t<p>{text}</p>\t{date.isoformat()}\t{source_id}\tbench{k}\t{text}\n")
+                buffer.seek(0)
+                cursor.copy_expert(
+                    "COPY article (article_name, article_text, publication_date, source_id, article_hash, clean_text) FROM STDIN",
+                    buffer
+                )
+                print(f"loaded {chunk_end} articles")
+            cursor.execute("ANALYZE article")
+
+
+def measure_queries(news_repository, queries, limit, source_id):
+    """
+    Returns:
+        tuple: Latency of every page in milliseconds and the number of found articles
+    """
+    latencies, result_count = [], 0
+    for query in queries:
+        started = time.perf_counter()
+        page, max_id, _ = news_repository.search_articles(query, limit=limit, source_ids=[source_id])
+        latencies.append((time.perf_counter() - started) * 1000)
+        result_count += len(page)
+        if len(page) == limit:
+            started = time.perf_counter()
+            next_page, _, _ = news_repository.search_articles(query, limit=limit, before_rank=page[-1][2],
+                                                           before_id=page[-1][0].id, max_id=max_id,
+                                                           source_ids=[source_id])
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert not {article.id for article, _, _ in page} & {article.id for article, _, _ in next_page}
+    return latencies, result_count
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=1000000)
+    parser.add_argument('--words', type=int, default=40)
+    parser.add_argument('--vocabulary', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = build_vocabulary(args.vocabulary, rng)
+    news_repository = NewsRepository()
+    with news_repository.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO source (source_key, source_name) VALUES ('search_bench', 'Search benchmark') RETURNING id"
+            )
+            source_id = cursor.fetchone()[0]
+    try:
+        started = time.perf_counter()
+        write_articles(news_repository, source_id, args.articles, args.words, vocabulary, args.seed)
+        print(f"{args.articles} articles loaded and indexed in {time.perf_counter() - started:.0f}s")
+
+        # typeahead: prefixes of frequent and rare words, then two-word queries
+        queries = []
+        for _ in range(args.queries):
+            word = vocabulary[len(STOP_WORDS) + min(int(rng.paretovariate(0.5)), len(vocabulary) - len(STOP_WORDS)) - 1]
+            queries.append(word[:rng.randint(1, len(word))] if rng.random() < 0.5 else
+                           f"{rng.choice(vocabulary[len(STOP_WORDS):1000])} {word}")
+        latencies, result_count = measure_queries(news_repository, queries, args.limit, source_id)
+        print(f"{len(queries)} queries, {len(latencies)} pages, {result_count / len(queries):.1f} results on the first page")
+        print(f"latency per page: p50 {percentile(latencies, 0.5):.1f} ms, p95 {percentile(latencies, 0.95):.1f} ms, "
+              f"max {max(latencies):.1f} ms")
+    finally:
+        with news_repository.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM article WHERE source_id = %s", (source_id,))
+                cursor.execute("DELETE FROM source WHERE id = %s", (source_id,))
+
+
+if __name__ == '__main__':
+    main()
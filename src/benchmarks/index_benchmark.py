@@ -0,0 +1,126 @@
+"""
+Compare query plans of the hot repository queries with and without the secondary indexes.
+
+Synthetic rows are inserted and the indexes are dropped inside one transaction which is
+rolled back at the end, so the database is left untouched.
+
+Usage (from src/):
+    python -m benchmarks.index_benchmark --articles 200000 --events 20000
+"""
+import argparse
+from news_db.db_config import DatabaseConfig
+from news_db.news_repository import ARTICLES_PAGE_QUERY
+
+
+INDEXES = [
+    'article_publication_date_idx',
+    'article_article_hash_idx',
+    'article_source_publication_date_idx',
+    'article_to_event_event_id_idx',
+    'event_topic_id_idx',
+]
+
+def page_params(**filters):
+    """Parameters of the first page of NewsRepository.get_articles_page."""
+    params = {'before_date': None, 'before_id': 2 ** 63 - 1, 'date_from': None, 'date_to': None,
+              'source_ids': None, 'limit': 50}
+    params.update(filters)
+    return params
+
+
+# the listing queries are the ones of the repository, so the plans are the ones the explorer gets
+QUERIES = {
+    'latest articles': (ARTICLES_PAGE_QUERY, page_params()),
+    'article by hash': ("""
+        SELECT a.id FROM article a WHERE a.article_hash = md5('benchmark 4242')
+    """, None),
+    'latest articles of source': (ARTICLES_PAGE_QUERY, page_params(source_ids=[3])),
+    'articles of event': ("""
+        SELECT a.id, a.article_name, a.publication_date
+        FROM article a
+        JOIN article_to_event a2e ON a.id = a2e.article_id
+        WHERE a2e.event_id = (SELECT max(id) FROM event)
+    """, None),
+    'events of topic': ("""
+        SELECT e.id, e.name FROM event e WHERE e.topic_id = (SELECT max(id) FROM topic)
+    """, None),
+}
+
+
+def seed(cursor, article_count, event_count, topic_count):
+    cursor.execute("""
+        INSERT INTO article (article_name, article_text, publication_date, source_id, article_hash)
+        SELECT 'benchmark', repeat('benchmark text ' || i || ' ', 40),
+               timestamp '2020-01-01' + i * interval '1 minute',
+               (SELECT id FROM source ORDER BY id OFFSET i %% (SELECT count(*) FROM source) LIMIT 1),
+               md5('benchmark ' || i)
+        FROM generate_series(1, %s) i
+    """, (article_count,))
+    cursor.execute("""
+        INSERT INTO topic (name) SELECT 'benchmark ' || i FROM generate_series(1, %s) i
+    """, (topic_count,))
+    cursor.execute("""
+        INSERT INTO event (name, topic_id)
+        SELECT 'benchmark ' || i, (SELECT min(id) FROM topic) + i %% %s
+        FROM generate_series(1, %s) i
+    """, (topic_count, event_count))
+    cursor.execute("""
+        INSERT INTO article_to_event (article_id, event_id)
+        SELECT a.id, (SELECT min(id) FROM event) + a.id %% %s
+        FROM article a
+        ON CONFLICT DO NOTHING
+    """, (event_count,))
+    cursor.execute("ANALYZE article, topic, event, article_to_event")
+
+
+def scan_nodes(plan):
+    nodes = [plan['Node Type']] if 'Scan' in plan['Node Type'] else []
+    for child in plan.get('Plans', []):
+        nodes.extend(scan_nodes(child))
+    return nodes
+
+
+def measure(cursor, repeats):
+    timings = {}
+    for name, (query, params) in QUERIES.items():
+        best = None
+        for _ in range(repeats):
+            cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query, params)
+            plan = cursor.fetchone()[0][0]
+            time = plan['Execution Time']
+            best = time if best is None else min(best, time)
+        timings[name] = (best, ', '.join(scan_nodes(plan['Plan'])))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=200000)
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--topics', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    conn = DatabaseConfig().create_connection()
+    try:
+        with conn.cursor() as cursor:
+            seed(cursor, args.articles, args.events, args.topics)
+            cursor.execute("SAVEPOINT with_indexes")
+            for index in INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {index}")
+            cursor.execute("ANALYZE article, event, article_to_event")
+            before = measure(cursor, args.repeats)
+            cursor.execute("ROLLBACK TO SAVEPOINT with_indexes")
+            after = measure(cursor, args.repeats)
+    finally:
+        conn.rollback()
+        conn.close()
+
+    print(f"{'query':<28} {'before, ms':>12} {'after, ms':>12}  scans before -> after")
+    for name in QUERIES:
+        (time_before, plan_before), (time_after, plan_after) = before[name], after[name]
+        print(f"{name:<28} {time_before:>12.3f} {time_after:>12.3f}  {plan_before} -> {plan_after}")
+
+
+if __name__ == '__main__':
+    main()
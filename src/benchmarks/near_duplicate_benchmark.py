@@ -0,0 +1,106 @@
+"""
+Measure throughput, recall and false positives of the near-duplicate detector on a synthetic corpus.
+
+The corpus contains unique stories, reposts of them with the typical edits of Telegram
+channels (markup, emoji, a channel signature, a few changed words) and hard negatives:
+different stories sharing half of their text with another story.
+
+Usage (from src/):
+    python -m benchmarks.near_duplicate_benchmark --stories 5000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from news_db.model import Article
+from news_aggregator.near_duplicates import NearDuplicateDetector
+
+
+SYLLABLES = ['ра', 'но', 'ми', 'ко', 'ст', 'ве', 'ли', 'да', 'пр', 'ен', 'ов', 'ка', 'ту', 'зы', 'че', 'шо']
+SIGNATURES = ['Подписывайтесь на канал', 'Прислать новость', 'Срочно', '⚡️ Молния']
+
+
+def random_words(rng, count, vocabulary):
+    return [rng.choice(vocabulary) for _ in range(count)]
+
+
+def repost(rng, words, vocabulary):
+    words = list(words)
+    for _ in range(rng.randint(0, 2)):
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    text = ' '.join(words)
+    if rng.random() < 0.5:
+        text = f"<p><b>{text}</b></p>"
+    if rng.random() < 0.5:
+        text = '🔥 ' + text + ' 👉'
+    return text + '\n\n' + rng.choice(SIGNATURES)
+
+
+def build_corpus(story_count, repost_share, negative_share, words_per_story, seed):
+    """
+    Returns:
+        tuple: (articles, story of every article), reposts share the story of their original
+    """
+    rng = random.Random(seed)
+    vocabulary = list({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(20000)})
+    start = datetime(2025, 1, 1)
+    articles, stories = [], []
+
+    def add(text, story, minute):
+        articles.append(Article(id=len(articles) + 1, name='benchmark', text=text,
+                                publication_date=start + timedelta(minutes=minute), source_id=1))
+        stories.append(story)
+
+    texts = []
+    for story in range(story_count):
+        minute = story * 2
+        if texts and rng.random() < negative_share:
+            # a different story with the same first half, e.g. an update of a templated post
+            words = texts[-1][:words_per_story // 2] + random_words(rng, words_per_story - words_per_story // 2, vocabulary)
+        else:
+            words = random_words(rng, words_per_story, vocabulary)
+        texts.append(words)
+        add(' '.join(words), story, minute)
+        if rng.random() < repost_share:
+            for _ in range(rng.randint(1, 2)):
+                add(repost(rng, words, vocabulary), story, minute + rng.randint(1, 30))
+
+    order = sorted(range(len(articles)), key=lambda k: articles[k].publication_date)
+    return [articles[k] for k in order], [stories[k] for k in order]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stories', type=int, default=5000)
+    parser.add_argument('--repost-share', type=float, default=0.3)
+    parser.add_argument('--negative-share', type=float, default=0.2)
+    parser.add_argument('--words', type=int, default=40)
+    parser.add_argument('--threshold', type=float, default=0.6)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    articles, stories = build_corpus(args.stories, args.repost_share, args.negative_share, args.words, args.seed)
+    story_of = {article.id: story for article, story in zip(articles, stories)}
+    detector = NearDuplicateDetector(threshold=args.threshold)
+
+    started = time.perf_counter()
+    links = {}
+    for article in articles:
+        _, duplicate_of = detector.process(article)
+        if duplicate_of is not None:
+            links[article.id] = duplicate_of
+    seconds = time.perf_counter() - started
+
+    expected = len(articles) - len(set(stories))
+    true_links = sum(story_of[article_id] == story_of[original] for article_id, original in links.items())
+    false_links = len(links) - true_links
+    unique_count = len(set(stories))
+    print(f"{len(articles)} articles, {unique_count} stories, {expected} reposts")
+    print(f"throughput: {len(articles) / seconds:.0f} articles/sec")
+    print(f"recall: {true_links / expected if expected else 1.0:.4f} ({true_links} of {expected} reposts linked)")
+    print(f"false positive rate: {false_links / unique_count:.4f} ({false_links} distinct stories linked)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare memory of article vectors held as separate arrays, as read from article_features,
+with views of a memory-mapped VectorStore.
+
+Usage (from src/):
+    python -m benchmarks.vector_store_benchmark --articles 200000 --path /tmp/vector_store
+"""
+import argparse
+import shutil
+import time
+import tracemalloc
+import numpy as np
+
+from news_aggregator.vector_store import VectorStore
+
+
+def measure(build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=200000)
+    parser.add_argument('--dimension', type=int, default=300)
+    parser.add_argument('--path', default='/tmp/vector_store_benchmark')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    vectors = rng.random((args.articles, args.dimension), dtype=np.float32)
+    article_ids = list(range(1, args.articles + 1))
+    # psycopg2 returns bytea columns as memoryview objects
+    rows = [memoryview(vector.tobytes()) for vector in vectors]
+
+    shutil.rmtree(args.path, ignore_errors=True)
+    store = VectorStore(args.path, 'benchmark')
+    _, seconds, _ = measure(lambda: store.append(article_ids, vectors))
+    print(f"{args.articles} vectors of dimension {args.dimension}, appended in {seconds:.2f}s")
+
+    # bytes read from the database are copied into per-article arrays
+    _, seconds, peak = measure(lambda: [np.frombuffer(bytes(row), dtype=np.float32) for row in rows])
+    print(f"arrays from database rows: {peak:.0f} MB in {seconds:.2f}s")
+
+    store = VectorStore(args.path, 'benchmark')
+    views, seconds, peak = measure(lambda: [store.get(article_id) for article_id in article_ids])
+    print(f"views of the store: {peak:.0f} MB in {seconds:.2f}s, the vectors stay in the page cache")
+    print(f"vectors equal: {all(np.array_equal(view, vector) for view, vector in zip(views[:1000], vectors[:1000]))}")
+    shutil.rmtree(args.path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
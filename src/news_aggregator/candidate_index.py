@@ -0,0 +1,61 @@
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+
+class CandidateIndex:
+    def __init__(self, entity_index, vectors, n_neighbors=10):
+        """
+        Build candidate generation indexes for the pairwise scoring.
+
+        Args:
+            entity_index (EntityIndex): Entities of the articles
+            vectors (list): Document vector for every article
+            n_neighbors (int, optional): How many nearest neighbours of an article become candidates,
+                0 to use only the shared entities
+        """
+        self.entity_index = entity_index
+        # inverted index: articles of an entity are the rows of its column
+        self.postings = entity_index.incidence.tocsc()
+        self.postings.sort_indices()
+        self.neighbours = self.__build_neighbours(vectors, n_neighbors)
+
+
+    def __build_neighbours(self, vectors, n_neighbors):
+        neighbours = [set() for _ in range(len(vectors))]
+        if len(vectors) < 2 or n_neighbors <= 0:
+            return neighbours
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+        # on unit vectors euclidean order equals cosine order
+        index = NearestNeighbors(n_neighbors=min(n_neighbors + 1, len(vectors))).fit(matrix)
+        _, indices = index.kneighbors(matrix)
+        for i, row in enumerate(indices):
+            for j in row:
+                if i != j:
+                    neighbours[i].add(int(j))
+                    neighbours[j].add(i)
+        return neighbours
+
+
+    def candidates(self, i, end=None):
+        """
+        Get articles after the given one which may belong to its group.
+
+        An article is a candidate if it shares an entity or an alias of one
+        with the given one or if they are among each other's nearest neighbours.
+
+        Args:
+            i (int): Index of the article
+            end (int, optional): Exclusive upper bound of candidate indices
+
+        Returns:
+            list: Sorted indices of candidate articles greater than i
+        """
+        end = len(self.neighbours) if end is None else end
+        result = {j for j in self.neighbours[i] if i < j < end}
+        for entity_id in self.entity_index.aliases(i):
+            posting = self.postings.indices[self.postings.indptr[entity_id]:self.postings.indptr[entity_id + 1]]
+            start, stop = np.searchsorted(posting, [i + 1, end])
+            result.update(posting[start:stop].tolist())
+        return sorted(result)
@@ -0,0 +1,178 @@
+import numpy as np
+from scipy import sparse
+from sklearn.cluster import DBSCAN
+
+from news_aggregator.candidate_index import CandidateIndex
+from news_aggregator.entity_index import EntityIndex
+from news_aggregator.similarity_engine import SimilarityEngine
+
+
+VECTOR_SIMILARITY_THRESHOLD = 0.95
+NER_SIMILARITY_THRESHOLD = 0.2
+STRONG_NER_SIMILARITY_THRESHOLD = 0.8
+
+
+def is_same_event(vector_similarity, ner_similarity):
+  return (vector_similarity > VECTOR_SIMILARITY_THRESHOLD and ner_similarity > NER_SIMILARITY_THRESHOLD
+          or ner_similarity > STRONG_NER_SIMILARITY_THRESHOLD)
+
+
+def group_articles(news_features, block_size=1024, tile_size=None, on_pair=None,
+                   window_ends=None, seed_count=None, grouped=None):
+  """
+  Greedily group articles: every ungrouped article starts a group and takes
+  all later ungrouped articles similar to it.
+
+  Args:
+      news_features (list): ArticleFeatures of the articles, newest first
+      block_size (int, optional): Rows per similarity block
+      tile_size (int, optional): Columns per similarity tile
+      on_pair (callable, optional): Called as on_pair(i, j, vector_similarity, ner_similarity, matched)
+          for every compared pair
+      window_ends (list, optional): For every article the exclusive index of the last article
+          it is compared with, see time_windows.window_ends
+      seed_count (int, optional): Only the first seed_count articles may start a group
+      grouped (set, optional): Indices of articles already grouped elsewhere
+
+  Returns:
+      list: Groups as lists of article indices
+  """
+  if not news_features:
+    return []
+  seed_count = len(news_features) if seed_count is None else min(seed_count, len(news_features))
+  similarity_engine = SimilarityEngine([f.vector for f in news_features], block_size, tile_size)
+  close_vectors = similarity_engine.pairs_above(VECTOR_SIMILARITY_THRESHOLD, window_ends, seed_count)
+  entity_index = EntityIndex([f.entities for f in news_features])
+  # is_same_event needs a NER similarity above NER_SIMILARITY_THRESHOLD, so only articles sharing
+  # an entity can match and the nearest neighbour search would not change any group
+  candidate_index = CandidateIndex(entity_index, similarity_engine.matrix, n_neighbors=0)
+
+  groupped_news = set(grouped or ())
+  news_groups = []
+  for i in range(seed_count):
+    if i in groupped_news:
+      continue
+    groupped_news.add(i)
+    news_group = [i]
+    end = window_ends[i] if window_ends is not None else None
+    candidates = [j for j in candidate_index.candidates(i, end) if j not in groupped_news]
+    ner_similarities = entity_index.similarity_block([i], candidates)[0]
+    for j, ner_similarity in zip(candidates, ner_similarities):
+      # only pairs above the vector threshold matter for grouping
+      vector_similarity = close_vectors[i].get(j, 0.0)
+      matched = is_same_event(vector_similarity, ner_similarity)
+      if matched:
+        groupped_news.add(j)
+        news_group.append(j)
+      if on_pair:
+        on_pair(i, j, close_vectors[i].get(j) or similarity_engine.similarity(i, j), ner_similarity, matched)
+    news_groups.append(news_group)
+  return news_groups
+
+
+class ClusteringBackend:
+  """Algorithm which splits articles into groups of the same event."""
+
+  def group(self, news_features, window_ends=None):
+    """
+    Group articles.
+
+    Args:
+        news_features (list): ArticleFeatures of the articles, newest first
+        window_ends (list, optional): For every article the exclusive index of the last article
+            it may be grouped with
+
+    Returns:
+        list: Groups as lists of article indices
+    """
+    raise NotImplementedError
+
+
+class GreedyBackend(ClusteringBackend):
+  def __init__(self, block_size=1024, tile_size=None, on_pair=None):
+    """
+    Order-dependent single pass grouping with the similarity thresholds.
+
+    Args:
+        block_size (int, optional): Rows per similarity block
+        tile_size (int, optional): Columns per similarity tile
+        on_pair (callable, optional): See group_articles
+    """
+    self.block_size = block_size
+    self.tile_size = tile_size
+    self.on_pair = on_pair
+
+
+  def group(self, news_features, window_ends=None):
+    return group_articles(news_features, self.block_size, self.tile_size, self.on_pair, window_ends)
+
+
+class DBSCANBackend(ClusteringBackend):
+  def __init__(self, eps=0.25, min_samples=1, vector_weight=0.5, n_neighbors=10, n_jobs=None, block_size=1024):
+    """
+    DBSCAN over a sparse precomputed distance of candidate pairs.
+
+    Distance of a pair is 1 - (vector_weight * vector similarity + (1 - vector_weight) * NER similarity).
+    Only pairs from candidate generation get a distance, all other pairs are never neighbours.
+
+    Args:
+        eps (float, optional): Maximum distance between neighbours
+        min_samples (int, optional): Minimum neighbourhood size of a core article
+        vector_weight (float, optional): Weight of the vector similarity in the distance
+        n_neighbors (int, optional): Nearest neighbours of an article used as candidates
+        n_jobs (int, optional): Number of parallel jobs of the neighbour search
+        block_size (int, optional): Rows per similarity block
+    """
+    self.eps = eps
+    self.min_samples = min_samples
+    self.vector_weight = vector_weight
+    self.n_neighbors = n_neighbors
+    self.n_jobs = n_jobs
+    self.block_size = block_size
+
+
+  def distance_matrix(self, news_features, window_ends=None):
+    """
+    Build the sparse symmetric distance matrix of candidate pairs.
+
+    Args:
+        news_features (list): ArticleFeatures of the articles
+        window_ends (list, optional): See ClusteringBackend.group
+
+    Returns:
+        scipy.sparse.csr_matrix: Distances of candidate pairs
+    """
+    n = len(news_features)
+    similarity_engine = SimilarityEngine([f.vector for f in news_features], self.block_size)
+    entity_index = EntityIndex([f.entities for f in news_features])
+    candidate_index = CandidateIndex(entity_index, similarity_engine.matrix, self.n_neighbors)
+    rows, columns, distances = [], [], []
+    for i in range(n):
+      candidates = candidate_index.candidates(i, window_ends[i] if window_ends is not None else None)
+      if not candidates:
+        continue
+      similarity = (
+        self.vector_weight * similarity_engine.block([i], candidates)[0]
+        + (1 - self.vector_weight) * entity_index.similarity_block([i], candidates)[0]
+      )
+      # explicit zeros are kept by DBSCAN, but keep distances positive anyway
+      distance = np.clip(1 - similarity, 1e-9, None)
+      rows.extend([i] * len(candidates))
+      columns.extend(candidates)
+      distances.extend(distance.tolist())
+    matrix = sparse.csr_matrix((distances, (rows, columns)), shape=(n, n))
+    return matrix.maximum(matrix.T).tocsr()
+
+
+  def group(self, news_features, window_ends=None):
+    if not news_features:
+      return []
+    distances = self.distance_matrix(news_features, window_ends)
+    labels = DBSCAN(
+      eps=self.eps, min_samples=self.min_samples, metric='precomputed', n_jobs=self.n_jobs
+    ).fit_predict(distances)
+    groups = {}
+    for i, label in enumerate(labels):
+      # noise articles stay alone as in the greedy algorithm
+      groups.setdefault(label if label >= 0 else ('noise', i), []).append(i)
+    return sorted(groups.values(), key=lambda group: group[0])
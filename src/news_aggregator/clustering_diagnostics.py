@@ -0,0 +1,93 @@
+import heapq
+import json
+import random
+
+
+class ClusteringDiagnostics:
+    def __init__(self, path, sample_rate=0.01, top_k=5, seed=0):
+        """
+        Opt-in record of how a sample of articles was compared during clustering.
+
+        For every sampled article the top_k most similar compared articles are kept,
+        so memory is O(sampled articles * top_k) instead of O(compared pairs).
+
+        Args:
+            path (str): Output file, .jsonl or .parquet (requires pyarrow)
+            sample_rate (float, optional): Share of articles to record
+            top_k (int, optional): Number of most similar compared articles kept per sampled article
+            seed (int, optional): Seed of the sampling
+        """
+        if not path.endswith(('.jsonl', '.parquet')):
+            raise ValueError(f"Unsupported diagnostics format: {path}")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.top_k = top_k
+        self.seed = seed
+        self.sampled = set()
+        self.top_pairs = {}
+        self.pair_count = 0
+
+
+    def start(self, article_count):
+        """Choose the sampled articles of a run over article_count articles."""
+        rng = random.Random(self.seed)
+        self.sampled = {i for i in range(article_count) if rng.random() < self.sample_rate}
+        self.top_pairs = {i: [] for i in self.sampled}
+        self.pair_count = 0
+
+
+    def on_pair(self, i, j, vector_similarity, ner_similarity, matched):
+        """Callback for GreedyBackend, see group_articles."""
+        self.pair_count += 1
+        for article, other in ((i, j), (j, i)):
+            if article in self.sampled:
+                entry = (float(vector_similarity), float(ner_similarity), bool(matched), other)
+                if len(self.top_pairs[article]) < self.top_k:
+                    heapq.heappush(self.top_pairs[article], entry)
+                else:
+                    heapq.heappushpop(self.top_pairs[article], entry)
+
+
+    def records(self, news, news_features, index_groups):
+        group_of = {i: number for number, group in enumerate(index_groups) for i in group}
+        for i in sorted(self.sampled):
+            yield {
+                'article_id': news[i].id,
+                'publication_date': news[i].publication_date.isoformat(),
+                'group': group_of.get(i),
+                'group_size': len(index_groups[group_of[i]]) if i in group_of else None,
+                'entities': list(news_features[i].entities),
+                'top_similar': [
+                    {
+                        'article_id': news[other].id,
+                        'vector_similarity': vector_similarity,
+                        'ner_similarity': ner_similarity,
+                        'matched': matched
+                    }
+                    for vector_similarity, ner_similarity, matched, other in sorted(self.top_pairs[i], reverse=True)
+                ]
+            }
+
+
+    def write(self, news, news_features, index_groups):
+        """
+        Write the records of the sampled articles.
+
+        Args:
+            news (list): Clustered Article objects
+            news_features (list): ArticleFeatures of the articles
+            index_groups (list): Groups as lists of article indices
+        """
+        records = list(self.records(news, news_features, index_groups))
+        if self.path.endswith('.parquet'):
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise ImportError("pyarrow is required to write diagnostics in the Parquet format")
+            pyarrow.parquet.write_table(pyarrow.Table.from_pylist(records), self.path)
+        else:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        print(f"Diagnostics: {len(records)} sampled articles of {len(news)}, {self.pair_count} compared pairs, written to {self.path}")
@@ -0,0 +1,111 @@
+import numpy as np
+from scipy import sparse
+
+
+def substring_aliases(lemmas):
+    """
+    Find entity lemmas which are equal under the substring rule of the clustering.
+
+    Instead of comparing every lemma with every other one, all substrings of a lemma
+    are looked up in the vocabulary, so the cost depends on lemma length only.
+
+    Args:
+        lemmas (iterable): Entity lemmas of the corpus
+
+    Returns:
+        dict: Mapping lemma -> set of other lemmas that contain it or are contained in it
+    """
+    vocabulary = set(lemmas)
+    aliases = {lemma: set() for lemma in vocabulary}
+    for lemma in vocabulary:
+        for start in range(len(lemma)):
+            for end in range(start + 1, len(lemma) + 1):
+                part = lemma[start:end]
+                if part != lemma and part in vocabulary:
+                    aliases[lemma].add(part)
+                    aliases[part].add(lemma)
+    return aliases
+
+
+class EntityIndex:
+    def __init__(self, entity_lists):
+        """
+        Intern entity lemmas and build the sparse article x entity incidence matrix.
+
+        Args:
+            entity_lists (list): Entity lemmas of every article, duplicates are allowed
+        """
+        self.entity_ids = {}
+        rows, columns = [], []
+        for i, entities in enumerate(entity_lists):
+            for lemma in set(entities):
+                rows.append(i)
+                columns.append(self.entity_ids.setdefault(lemma, len(self.entity_ids)))
+        shape = (len(entity_lists), len(self.entity_ids))
+        self.incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, columns)), shape=shape
+        )
+        # inverse document frequency of every entity
+        counts = np.asarray(self.incidence.sum(axis=0)).ravel()
+        self.weights = np.divide(1.0, counts, out=np.zeros_like(counts), where=counts > 0)
+        self.alias_map = self.__build_alias_map()
+        # entities of an article together with all their aliases
+        self.expanded = (self.incidence @ self.alias_map).astype(bool).astype(np.float64).tocsr()
+        weight_matrix = sparse.diags(self.weights)
+        self.weighted_incidence = (self.incidence @ weight_matrix).tocsr()
+        self.weighted_expanded = (self.expanded @ weight_matrix).tocsr()
+        self.totals = self.incidence @ self.weights
+
+
+    def __build_alias_map(self):
+        rows, columns = [], []
+        for lemma, aliases in substring_aliases(self.entity_ids.keys()).items():
+            entity_id = self.entity_ids[lemma]
+            rows.append(entity_id)
+            columns.append(entity_id)
+            for alias in aliases:
+                rows.append(entity_id)
+                columns.append(self.entity_ids[alias])
+        size = len(self.entity_ids)
+        return sparse.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(size, size))
+
+
+    def aliases(self, i):
+        """
+        Get entity IDs of an article together with their aliases.
+
+        Args:
+            i (int): Index of the article
+
+        Returns:
+            numpy.ndarray: IDs of the entities matched by the article
+        """
+        return self.expanded.indices[self.expanded.indptr[i]:self.expanded.indptr[i + 1]]
+
+
+    def similarity_block(self, rows, columns):
+        """
+        Compute named entity similarity for a block of article pairs.
+
+        An entity of one article counts as matched if the other article has it or one of
+        its aliases. Similarity is the weight of matched entities divided by the weight
+        of all entities of both articles.
+
+        Args:
+            rows (list): Indices of the first articles
+            columns (list): Indices of the second articles
+
+        Returns:
+            numpy.ndarray: Matrix of similarities of shape (len(rows), len(columns))
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        shared = (self.weighted_incidence[rows] @ self.incidence[columns].T).toarray()
+        matched = (
+            (self.weighted_incidence[rows] @ self.expanded[columns].T).toarray()
+            + (self.weighted_expanded[rows] @ self.incidence[columns].T).toarray()
+            - shared
+        )
+        total = self.totals[rows][:, None] + self.totals[columns][None, :] - shared
+        return np.divide(matched, total, out=np.zeros_like(matched), where=total > 0)
+
@@ -0,0 +1,59 @@
+import numpy as np
+
+from news_db.model import EventProfile
+from news_aggregator.nlp_pipeline import ArticleFeatures
+
+
+def unit_vector(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def profile_features(profile: EventProfile) -> ArticleFeatures:
+    """
+    Represent an event profile as features of a single document.
+
+    Args:
+        profile (EventProfile): Stored profile of the event
+
+    Returns:
+        ArticleFeatures: Centroid direction and entity lemmas of the event
+    """
+    return ArticleFeatures(np.frombuffer(profile.vector_sum, dtype=np.float32), list(profile.entities))
+
+
+def add_to_profile(profile: EventProfile, features: ArticleFeatures, publication_date):
+    """
+    Add an article to the profile of its event.
+
+    Args:
+        profile (EventProfile): Profile to be updated in place
+        features (ArticleFeatures): Features of the article
+        publication_date (datetime): Publication date of the article
+    """
+    vector_sum = np.frombuffer(profile.vector_sum, dtype=np.float32) + unit_vector(features.vector)
+    profile.vector_sum = vector_sum.astype(np.float32).tobytes()
+    profile.entities = sorted(set(profile.entities) | set(features.entities))
+    profile.article_count += 1
+    if not profile.latest_publication_date or publication_date > profile.latest_publication_date:
+        profile.latest_publication_date = publication_date
+
+
+def build_profile(event_id, articles, features):
+    """
+    Build the profile of a new event.
+
+    Args:
+        event_id (int): ID of the event
+        articles (list): Article objects of the event
+        features (list): ArticleFeatures of the articles
+
+    Returns:
+        EventProfile: Profile of the event
+    """
+    dimension = len(features[0].vector) if features else 0
+    profile = EventProfile(event_id, np.zeros(dimension, dtype=np.float32).tobytes(), [], 0)
+    for article, article_features in zip(articles, features):
+        add_to_profile(profile, article_features, article.publication_date)
+    return profile
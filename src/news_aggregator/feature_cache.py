@@ -0,0 +1,128 @@
+import time
+import numpy as np
+from spacy.util import get_package_version
+
+from news_db.feature_repository import FeatureRepository
+from news_aggregator.nlp_pipeline import MODEL_NAME, ArticleFeatures, load_model, process_texts
+from news_aggregator.vector_store import VectorStore
+
+
+# number of articles whose texts are loaded at once for the model
+TEXT_CHUNK_SIZE = 2000
+
+
+class FeatureCache:
+    def __init__(self, feature_repository: FeatureRepository = None, model_name: str = MODEL_NAME,
+                 batch_size: int = 256, n_process: int = 1, vector_store_path: str = None):
+        """
+        Persistent store of article NLP features keyed by article hash.
+
+        Features are versioned by model name and package version, so switching
+        or upgrading the spaCy model starts a fresh cache.
+
+        Args:
+            feature_repository (FeatureRepository, optional): Storage of the features
+            model_name (str, optional): Name of the spaCy model
+            batch_size (int, optional): Number of texts in one nlp.pipe batch
+            n_process (int, optional): Number of nlp.pipe worker processes
+            vector_store_path (str, optional): Directory of a VectorStore; if set, vectors are served
+                from it as views of a memory-mapped file and only entities are read from the database
+        """
+        self.feature_repository = feature_repository or FeatureRepository()
+        self.model_name = model_name
+        self.model_version = f"{model_name}-{get_package_version(model_name)}"
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.model = None
+        self.vector_store = VectorStore(vector_store_path, self.model_version) if vector_store_path else None
+        self.processed_count = 0
+        self.processing_time = 0.0
+
+
+    def get_features(self, articles, clean, load_texts=None):
+        """
+        Get features of articles, running the model only on articles missing in the cache.
+
+        Articles may be loaded without their texts if load_texts is given: only the texts
+        of the articles the model runs on are then loaded, TEXT_CHUNK_SIZE at a time,
+        and dropped again once they are cleaned.
+
+        Args:
+            articles (list): Article objects
+            clean (callable): Function turning an article into model input
+            load_texts (callable, optional): Fills in the texts of a list of articles loaded without them
+
+        Returns:
+            list: ArticleFeatures of every article, in input order
+        """
+        if self.vector_store is None:
+            features = self.__get_features_by_hash(articles, clean, load_texts)
+            return [features[article.article_hash] for article in articles]
+
+        self.vector_store.refresh()
+        stored = [article for article in articles if article.id in self.vector_store]
+        entities = self.feature_repository.get_entities(self.model_version, [article.article_hash for article in stored])
+        features_by_id = {
+            article.id: ArticleFeatures(self.vector_store.get(article.id), entities[article.article_hash])
+            for article in stored if article.article_hash in entities
+        }
+        missing = list({article.id: article for article in articles if article.id not in features_by_id}.values())
+        if missing:
+            features = self.__get_features_by_hash(missing, clean, load_texts)
+            self.vector_store.append([article.id for article in missing],
+                                     [features[article.article_hash].vector for article in missing])
+            # keep views of the store instead of the vectors read or computed now
+            features_by_id.update(
+                (article.id, ArticleFeatures(self.vector_store.get(article.id), features[article.article_hash].entities))
+                for article in missing
+            )
+        return [features_by_id[article.id] for article in articles]
+
+
+    def __get_features_by_hash(self, articles, clean, load_texts):
+        hashes = [article.article_hash for article in articles]
+        features = {
+            article_hash: ArticleFeatures(np.frombuffer(vector, dtype=np.float32), entities)
+            for article_hash, (vector, entities) in self.feature_repository.get_features(self.model_version, hashes).items()
+        }
+        missing = {}
+        for article in articles:
+            if article.article_hash not in features:
+                missing.setdefault(article.article_hash, article)
+        if missing:
+            if self.model is None:
+                self.model = load_model(self.model_name)
+            started = time.perf_counter()
+            texts = self.__iter_texts(list(missing.values()), clean, load_texts)
+            computed = dict(zip(missing.keys(), process_texts(self.model, texts, self.batch_size, self.n_process)))
+            self.processing_time += time.perf_counter() - started
+            self.processed_count += len(computed)
+            self.feature_repository.save_features(self.model_version, [
+                (article_hash, np.asarray(f.vector, dtype=np.float32).tobytes(), f.entities)
+                for article_hash, f in computed.items()
+            ])
+            features.update(computed)
+        return features
+
+
+    def __iter_texts(self, articles, clean, load_texts):
+        if load_texts is None:
+            yield from (clean(article) for article in articles)
+            return
+        for start in range(0, len(articles), TEXT_CHUNK_SIZE):
+            chunk = articles[start:start + TEXT_CHUNK_SIZE]
+            load_texts(chunk)
+            for article in chunk:
+                text = clean(article)
+                article.text = article.clean_text = None
+                yield text
+
+
+    def throughput(self):
+        """
+        Get NLP throughput of the articles processed so far.
+
+        Returns:
+            float: Processed articles per second
+        """
+        return self.processed_count / self.processing_time if self.processing_time else 0.0
@@ -0,0 +1,116 @@
+from datetime import timedelta
+import numpy as np
+
+from news_db.news_repository import NewsRepository
+from news_db.topic_repository import TopicRepository
+from news_db.model import Event
+from news_aggregator.entity_index import EntityIndex
+from news_aggregator.similarity_engine import SimilarityEngine
+from news_aggregator.nlp_pipeline import MODEL_NAME
+from news_aggregator.feature_cache import FeatureCache
+from news_aggregator.event_profiles import profile_features, add_to_profile, build_profile
+from news_aggregator.clustering_backends import (
+  VECTOR_SIMILARITY_THRESHOLD, NER_SIMILARITY_THRESHOLD, STRONG_NER_SIMILARITY_THRESHOLD, group_articles
+)
+from news_aggregator.near_duplicates import link_near_duplicates
+from news_aggregator.text_cleaning import article_clean_text, backfill_clean_text
+
+
+def match_events(profile_features_list, news_features, block_size=1024):
+  """
+  Find the best matching existing event for every new article.
+
+  Args:
+      profile_features_list (list): ArticleFeatures of the event profiles
+      news_features (list): ArticleFeatures of the new articles
+      block_size (int, optional): Number of new articles scored at once
+
+  Returns:
+      list: Index of the matched profile or None for every new article
+  """
+  profile_count = len(profile_features_list)
+  if profile_count == 0:
+    return [None] * len(news_features)
+  all_features = profile_features_list + news_features
+  similarity_engine = SimilarityEngine([f.vector for f in all_features], block_size)
+  entity_index = EntityIndex([f.entities for f in all_features])
+  profile_rows = np.arange(profile_count)
+
+  matches = []
+  for start in range(profile_count, len(all_features), block_size):
+    rows = np.arange(start, min(start + block_size, len(all_features)))
+    vector_similarities = similarity_engine.block(rows, profile_rows)
+    ner_similarities = entity_index.similarity_block(rows, profile_rows)
+    matched = (
+      (vector_similarities > VECTOR_SIMILARITY_THRESHOLD) & (ner_similarities > NER_SIMILARITY_THRESHOLD)
+      | (ner_similarities > STRONG_NER_SIMILARITY_THRESHOLD)
+    )
+    scores = np.where(matched, vector_similarities + ner_similarities, -np.inf)
+    best = scores.argmax(axis=1)
+    for k, profile_index in enumerate(best):
+      matches.append(int(profile_index) if matched[k, profile_index] else None)
+  return matches
+
+
+def run_incremental_clustering(horizon=timedelta(days=2), block_size=1024, tile_size=None,
+                               model_name=MODEL_NAME, batch_size=256, n_process=1, vector_store_path=None):
+  """
+  Cluster only articles not linked to any event yet: attach them to existing
+  events or group the rest into new events.
+
+  Unclustered articles are selected by the clustered flag, which is set when an article is
+  linked to an event, rather than by the greatest clustered ID, as IDs of concurrently
+  inserted articles are committed out of order.
+
+  Args:
+      horizon (timedelta, optional): Only events active within this period before the
+          oldest new article are considered, None to consider all events
+      block_size (int, optional): Rows per similarity block
+      tile_size (int, optional): Columns per similarity tile
+      model_name (str, optional): Name of the spaCy model
+      batch_size (int, optional): Number of texts in one nlp.pipe batch
+      n_process (int, optional): Number of nlp.pipe worker processes
+      vector_store_path (str, optional): Directory of a VectorStore serving the document vectors
+  """
+  news_repository = NewsRepository()
+  topic_repository = TopicRepository()
+  feature_cache = FeatureCache(model_name=model_name, batch_size=batch_size, n_process=n_process,
+                               vector_store_path=vector_store_path)
+
+  backfill_clean_text(news_repository)
+  link_near_duplicates(news_repository)
+  news = news_repository.get_unclustered_articles(exclude_duplicates=True)
+  if not news:
+    print("No new articles")
+    return
+  news_features = feature_cache.get_features(news, article_clean_text)
+
+  since = min(article.publication_date for article in news) - horizon if horizon else None
+  profiles = topic_repository.get_event_profiles(since)
+  matches = match_events([profile_features(p) for p in profiles], news_features, block_size)
+
+  unmatched = []
+  attached = {}
+  for k, profile_index in enumerate(matches):
+    if profile_index is None:
+      unmatched.append(k)
+      continue
+    attached.setdefault(profile_index, []).append(news[k].id)
+    add_to_profile(profiles[profile_index], news_features[k], news[k].publication_date)
+  result = [
+    (Event(id=profiles[i].event_id, name=None), article_ids, profiles[i])
+    for i, article_ids in attached.items()
+  ]
+
+  groups = group_articles([news_features[k] for k in unmatched], block_size, tile_size) if unmatched else []
+  for group in groups:
+    members = [unmatched[g] for g in group]
+    event = Event(id=None, name=f"Группа новостей {news[members[0]].id}", generated=True)
+    profile = build_profile(None, [news[k] for k in members], [news_features[k] for k in members])
+    result.append((event, [news[k].id for k in members], profile))
+
+  topic_repository.save_clustering_result(result)
+
+  print(f"{len(news)} new articles: {len(news) - len(unmatched)} attached to existing events, "
+        f"{len(groups)} new events")
+  print(f"NLP processing: {feature_cache.processed_count} new articles, {feature_cache.throughput():.1f} articles/sec")
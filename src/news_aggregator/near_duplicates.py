@@ -0,0 +1,233 @@
+import re
+import zlib
+from datetime import timedelta
+import numpy as np
+
+from news_aggregator.text_cleaning import article_clean_text
+
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def shingles(text, size=3):
+    """
+    Split text into overlapping sequences of words.
+
+    Args:
+        text (str): Cleaned text
+        size (int, optional): Number of words in a shingle
+
+    Returns:
+        set: Shingles of the lowercased text, the whole text for texts shorter than size words
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[k:k + size]) for k in range(len(tokens) - size + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_perm=64, shingle_size=3, seed=1):
+        """
+        MinHash signatures of texts under num_perm multiply-shift hash functions.
+
+        Signatures are stored in the database, so hash functions depend on the seed only
+        and must not change between runs.
+
+        Args:
+            num_perm (int, optional): Number of hash functions
+            shingle_size (int, optional): Number of words in a shingle
+            seed (int, optional): Seed of the hash functions
+        """
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.multipliers = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.offsets = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+
+    def signature(self, text):
+        """
+        Args:
+            text (str): Cleaned text
+
+        Returns:
+            np.ndarray: uint32 signature of num_perm values, None for texts without words
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text, self.shingle_size)), dtype=np.uint64
+        )
+        if hashes.size == 0:
+            return None
+        # uint64 arithmetic wraps around, the high 32 bits are the hash value
+        values = (self.multipliers[:, None] * hashes[None, :] + self.offsets[:, None]) >> np.uint64(32)
+        return values.min(axis=1).astype(np.uint32)
+
+
+def signature_similarity(first, second):
+    """Estimated Jaccard similarity of the shingle sets of two signatures."""
+    return np.count_nonzero(first == second) / len(first)
+
+
+class MinHashLSH:
+    def __init__(self, bands=16):
+        """
+        Locality-sensitive index which finds signatures equal in at least one band.
+
+        Args:
+            bands (int, optional): Number of bands the signature is split into
+        """
+        self.bands = bands
+        self.buckets = [{} for _ in range(bands)]
+
+
+    def __band_keys(self, signature):
+        rows = len(signature) // self.bands
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+
+    def add(self, key, signature):
+        # dicts keep keys in insertion order and remove them in O(1)
+        for bucket, band_key in zip(self.buckets, self.__band_keys(signature)):
+            bucket.setdefault(band_key, {})[key] = None
+
+
+    def remove(self, key, signature):
+        for bucket, band_key in zip(self.buckets, self.__band_keys(signature)):
+            keys = bucket.get(band_key)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del bucket[band_key]
+
+
+    def query(self, signature):
+        """
+        Returns:
+            set: Keys of the indexed signatures sharing a band with the signature
+        """
+        candidates = set()
+        for bucket, band_key in zip(self.buckets, self.__band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+        return candidates
+
+
+class NearDuplicateDetector:
+    def __init__(self, threshold=0.6, horizon=timedelta(days=2), num_perm=64, bands=16, shingle_size=3):
+        """
+        Find articles whose cleaned text is nearly the same as the text of an earlier processed article.
+
+        Articles stay indexed until they are evicted, see evict.
+
+        Args:
+            threshold (float, optional): Minimum estimated Jaccard similarity of shingles of duplicates
+            horizon (timedelta, optional): Maximum distance in time between duplicates
+            num_perm (int, optional): Number of MinHash functions
+            bands (int, optional): Number of LSH bands, num_perm must be divisible by it
+            shingle_size (int, optional): Number of words in a shingle
+        """
+        self.threshold = threshold
+        self.horizon = horizon
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.lsh = MinHashLSH(bands)
+        self.signatures = {}
+        self.dates = {}
+        # duplicates are linked to the first article of the story
+        self.originals = {}
+
+
+    def add(self, article_id, publication_date, signature, duplicate_of=None):
+        if article_id in self.signatures:
+            return
+        self.signatures[article_id] = signature
+        self.dates[article_id] = publication_date
+        self.originals[article_id] = duplicate_of or article_id
+        self.lsh.add(article_id, signature)
+
+
+    def evict(self, before):
+        """
+        Remove articles published before the date, they can not be duplicates of later articles.
+
+        Args:
+            before (datetime): Earliest publication date of the articles to keep
+
+        Returns:
+            int: Number of removed articles
+        """
+        evicted = [article_id for article_id, date in self.dates.items() if date < before]
+        for article_id in evicted:
+            self.lsh.remove(article_id, self.signatures.pop(article_id))
+            del self.dates[article_id]
+            del self.originals[article_id]
+        return len(evicted)
+
+
+    def find(self, publication_date, signature):
+        """
+        Returns:
+            int: ID of the original article the signature is a near duplicate of, None if there is none
+        """
+        best_id, best_similarity = None, self.threshold
+        for candidate_id in self.lsh.query(signature):
+            if abs(self.dates[candidate_id] - publication_date) > self.horizon:
+                continue
+            similarity = signature_similarity(self.signatures[candidate_id], signature)
+            if similarity >= best_similarity:
+                best_id, best_similarity = candidate_id, similarity
+        return self.originals[best_id] if best_id is not None else None
+
+
+    def process(self, article):
+        """
+        Sign an article, find its original and index it.
+
+        Args:
+            article (Article): Article to process
+
+        Returns:
+            tuple: (signature or None, ID of the original article or None)
+        """
+        signature = self.hasher.signature(article_clean_text(article))
+        if signature is None:
+            return None, None
+        duplicate_of = self.find(article.publication_date, signature)
+        self.add(article.id, article.publication_date, signature, duplicate_of)
+        return signature, duplicate_of
+
+
+def link_near_duplicates(news_repository, detector=None, batch_size=1000):
+    """
+    Sign all articles added since the previous run and link near duplicates to their originals.
+
+    The detector keeps only articles within its horizon of the current batch.
+
+    Args:
+        news_repository (NewsRepository): Repository to read and update articles with
+        detector (NearDuplicateDetector, optional): Detector to reuse between runs of a long-living process
+        batch_size (int, optional): Number of articles processed at once
+
+    Returns:
+        tuple: Number of signed articles and number of found duplicates
+    """
+    detector = detector or NearDuplicateDetector()
+    signed_count = duplicate_count = 0
+    while True:
+        articles = news_repository.get_unsigned_articles(batch_size)
+        if not articles:
+            break
+        dates = [article.publication_date for article in articles]
+        # articles are added in the order they were stored, so earlier articles are rarely needed again
+        detector.evict(min(dates) - detector.horizon)
+        stored = news_repository.get_article_signatures(min(dates) - detector.horizon, max(dates) + detector.horizon)
+        for article_id, publication_date, minhash, duplicate_of in stored:
+            detector.add(article_id, publication_date, np.frombuffer(minhash, dtype=np.uint32), duplicate_of)
+
+        rows = []
+        for article in articles:
+            signature, duplicate_of = detector.process(article)
+            rows.append((article.id, signature.tobytes() if signature is not None else b'', duplicate_of))
+            duplicate_count += duplicate_of is not None
+        news_repository.save_article_signatures(rows)
+        signed_count += len(articles)
+    return signed_count, duplicate_count
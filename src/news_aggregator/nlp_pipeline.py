@@ -0,0 +1,44 @@
+from typing import NamedTuple
+import numpy as np
+import spacy
+
+
+MODEL_NAME = 'ru_core_news_md'
+# clustering needs only entities, their lemmas and document vectors
+UNUSED_COMPONENTS = ['parser', 'senter']
+
+
+class ArticleFeatures(NamedTuple):
+    vector: np.ndarray
+    entities: list
+
+
+def load_model(model_name: str = MODEL_NAME, disable=UNUSED_COMPONENTS):
+    """
+    Load a spaCy model with unused pipeline components disabled.
+
+    Args:
+        model_name (str, optional): Name of the spaCy model
+        disable (list, optional): Names of the components to disable
+
+    Returns:
+        spacy.language.Language: Loaded pipeline
+    """
+    return spacy.load(model_name, disable=disable)
+
+
+def process_texts(model, texts, batch_size: int = 256, n_process: int = 1):
+    """
+    Run texts through the pipeline in batches and keep only the features used by clustering.
+
+    Args:
+        model (spacy.language.Language): Loaded pipeline
+        texts (iterable): Cleaned article texts
+        batch_size (int, optional): Number of texts in one batch
+        n_process (int, optional): Number of worker processes
+
+    Yields:
+        ArticleFeatures: Document vector and entity lemmas of every text, in input order
+    """
+    for doc in model.pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield ArticleFeatures(doc.vector, [ent.lemma_ for ent in doc.ents])
@@ -0,0 +1,102 @@
+import numpy as np
+
+
+class SimilarityEngine:
+    def __init__(self, vectors, block_size=1024, tile_size=None):
+        """
+        Stack document vectors into one row-normalized float32 matrix.
+
+        Args:
+            vectors (list): Document vector for every article
+            block_size (int, optional): Number of rows multiplied at once
+            tile_size (int, optional): If set, columns are split into tiles of this size as well,
+                so no more than block_size * tile_size similarities are held in memory
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(vectors), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        # zero vectors get zero similarity to everything, as in Doc.similarity
+        self.matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+        self.block_size = block_size
+        self.tile_size = tile_size
+
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+
+    def similarity(self, i, j):
+        """
+        Get cosine similarity of two articles.
+
+        Args:
+            i (int): Index of the first article
+            j (int): Index of the second article
+
+        Returns:
+            float: Cosine similarity of the document vectors
+        """
+        return float(self.matrix[i] @ self.matrix[j])
+
+
+    def block(self, rows, columns):
+        """
+        Get cosine similarities between two sets of articles.
+
+        Args:
+            rows (list): Indices of the first articles
+            columns (list): Indices of the second articles
+
+        Returns:
+            numpy.ndarray: Matrix of similarities of shape (len(rows), len(columns))
+        """
+        return self.matrix[rows] @ self.matrix[columns].T
+
+
+    def iter_blocks(self, window_ends=None, row_count=None):
+        """
+        Iterate over the upper triangle of the similarity matrix.
+
+        Args:
+            window_ends (list, optional): For every row the exclusive index of the last column
+                to compare with, must be non-decreasing
+            row_count (int, optional): Only the first row_count rows are computed
+
+        Yields:
+            tuple: (row_start, col_start, block) where block[a, b] is the similarity
+                of articles row_start + a and col_start + b
+        """
+        n = len(self)
+        row_count = n if row_count is None else min(row_count, n)
+        for row_start in range(0, row_count, self.block_size):
+            row_end = min(row_start + self.block_size, row_count)
+            rows = self.matrix[row_start:row_end]
+            col_end = window_ends[row_end - 1] if window_ends is not None else n
+            tile_size = self.tile_size or n
+            for col_start in range(row_start, col_end, tile_size):
+                columns = self.matrix[col_start:min(col_start + tile_size, col_end)]
+                yield row_start, col_start, rows @ columns.T
+
+
+    def pairs_above(self, threshold, window_ends=None, row_count=None):
+        """
+        Find all pairs of articles with similarity above the threshold.
+
+        Args:
+            threshold (float): Similarity threshold
+            window_ends (list, optional): For every row the exclusive index of the last column
+                to compare with, must be non-decreasing
+            row_count (int, optional): Only pairs of the first row_count articles are searched
+
+        Returns:
+            list: For every article a dict {j: similarity} of later articles j above the threshold
+        """
+        result = [{} for _ in range(len(self))]
+        for row_start, col_start, block in self.iter_blocks(window_ends, row_count):
+            rows, columns = np.nonzero(block > threshold)
+            for a, b in zip(rows.tolist(), columns.tolist()):
+                i, j = row_start + a, col_start + b
+                if j > i and (window_ends is None or j < window_ends[i]):
+                    result[i][j] = float(block[a, b])
+        return result
@@ -0,0 +1,85 @@
+import html
+import re
+
+
+EMOJI_PATTERN = re.compile("["
+        u"\U0001F600-\U0001F64F"  # emoticons
+        u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+        u"\U0001F680-\U0001F6FF"  # transport & map symbols
+        u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
+        u"\U00002500-\U00002BEF"  # chinese char
+        u"\U00002702-\U000027B0"
+        u"\U000024C2-\U0001F251"
+        u"\U0001f926-\U0001f937"
+        u"\U00010000-\U0010ffff"
+        u"\u2640-\u2642" 
+        u"\u2600-\u2B55"
+        u"\u200d"
+        u"\u23cf"
+        u"\u23e9"
+        u"\u231a"
+        u"\ufe0f"  # dingbats
+        u"\u3030"
+                           "]+", flags=re.UNICODE)
+
+
+# ranges of EMOJI_PATTERN merged, they overlap into a single range from \u24c2
+EMOJI_CHARS = '\u200d\u231a\u23cf\u23e9\u24c2-\U0010ffff'
+# one scan of the text: runs of kept characters are captured, tags and emoji are matched
+# without a group and dropped, a '<' without a closing '>' on its line is kept
+CLEAN_PATTERN = re.compile(f'([^<{EMOJI_CHARS}]+|<(?!.*>))|<.*?>|[{EMOJI_CHARS}]+')
+
+
+def clean_text(raw_html):
+  """
+  Turn the HTML of an article into plain text without emoji in a single regex pass.
+
+  Tags and emoji are removed as by the previous two-pass cleaning, then HTML entities
+  are decoded, so the result is the text a reader sees.
+
+  Args:
+      raw_html (str): Article text as stored by the fetchers
+
+  Returns:
+      str: Plain text
+  """
+  text = ''.join(CLEAN_PATTERN.findall(raw_html))
+  return html.unescape(text) if '&' in text else text
+
+
+def article_clean_text(article):
+  """Plain text of an article, cleaned at ingest or now for articles stored before the clean_text column."""
+  return article.clean_text if article.clean_text is not None else clean_text(article.text)
+
+
+def load_texts(news_repository, articles):
+  """
+  Fill in the texts of articles loaded without them.
+
+  Args:
+      news_repository (NewsRepository): Repository to read texts with
+      articles (list): Article objects, updated in place
+  """
+  texts = news_repository.get_article_texts([article.id for article in articles])
+  for article in articles:
+    article.text, article.clean_text = texts[article.id]
+
+
+def backfill_clean_text(news_repository, batch_size=1000):
+  """
+  Store clean_text of articles added without it.
+
+  Args:
+      news_repository (NewsRepository): Repository to read and update articles with
+      batch_size (int, optional): Number of articles updated at once
+
+  Returns:
+      int: Number of updated articles
+  """
+  count = 0
+  while True:
+    articles = news_repository.get_articles_without_clean_text(batch_size)
+    if not articles:
+      return count
+    news_repository.save_clean_texts([(article.id, clean_text(article.text)) for article in articles])
+    count += len(articles)
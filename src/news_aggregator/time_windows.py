@@ -0,0 +1,20 @@
+def window_ends(dates, horizon):
+    """
+    Find for every article the end of its comparison window.
+
+    Args:
+        dates (list): Publication dates sorted newest first
+        horizon (timedelta): Maximum distance in time between compared articles
+
+    Returns:
+        list: For every article the exclusive index of the first older article
+            published more than horizon before it, non-decreasing
+    """
+    ends = []
+    end = 0
+    for i, date in enumerate(dates):
+        end = max(end, i + 1)
+        while end < len(dates) and date - dates[end] <= horizon:
+            end += 1
+        ends.append(end)
+    return ends
@@ -0,0 +1,183 @@
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+import numpy as np
+
+
+META_FILE = 'meta.json'
+LOCK_FILE = 'lock'
+
+
+class VectorStore:
+    def __init__(self, path, model_version):
+        """
+        Append-only on-disk store of article document vectors.
+
+        Vectors are rows of a float32 matrix in a memory-mapped file, and the article IDs of the rows
+        are in a second file. Rows returned by get are views of the mapping, so processes reading
+        the same store share the vectors through the OS page cache instead of copying them.
+
+        Appends and compactions of all processes are serialized by an exclusive flock on a lock
+        file of the store, and a writer re-reads meta.json and the row count under the lock.
+        Rows are written before their IDs, so a torn append leaves rows without IDs which are
+        ignored by readers and cut by the next append. Compaction writes a new generation
+        of both files and switches meta.json to it with an atomic rename.
+
+        Args:
+            path (str): Directory of the store, created if missing
+            model_version (str): Name and version of the model the vectors are computed with,
+                a store of another model version is rejected
+        """
+        self.path = path
+        self.model_version = model_version
+        os.makedirs(path, exist_ok=True)
+        meta = self.__read_meta()
+        self.dimension = meta['dimension']
+        self.generation = meta['generation']
+        self.ids = np.empty(0, dtype=np.int64)
+        self.matrix = np.empty((0, self.dimension or 0), dtype=np.float32)
+        self.rows = {}
+        self.refresh()
+
+
+    def __len__(self):
+        return len(self.rows)
+
+
+    def __contains__(self, article_id):
+        return article_id in self.rows
+
+
+    def __file(self, kind, generation=None):
+        generation = self.generation if generation is None else generation
+        return os.path.join(self.path, f"{kind}.{generation}.bin")
+
+
+    def __read_meta(self):
+        meta_path = os.path.join(self.path, META_FILE)
+        if not os.path.exists(meta_path):
+            return {'model_version': self.model_version, 'dimension': None, 'generation': 0}
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['model_version'] != self.model_version:
+            raise ValueError(f"Vector store {self.path} contains vectors of {meta['model_version']}, not {self.model_version}")
+        return meta
+
+
+    @contextmanager
+    def __lock(self):
+        """Hold the write lock of the store and catch up with the writes of other processes."""
+        with open(os.path.join(self.path, LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                meta = self.__read_meta()
+                changed = (meta['dimension'], meta['generation']) != (self.dimension, self.generation)
+                self.dimension, self.generation = meta['dimension'], meta['generation']
+                self.refresh(force=changed)
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+    def __write_meta(self):
+        meta_path = os.path.join(self.path, META_FILE)
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'model_version': self.model_version, 'dimension': self.dimension,
+                       'generation': self.generation}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+
+    def refresh(self, force=False):
+        """
+        Map the rows appended since the store was opened, also by other processes.
+
+        Args:
+            force (bool, optional): Map the files even if the number of rows did not change
+        """
+        if self.dimension is None:
+            return
+        vectors_path, ids_path = self.__file('vectors'), self.__file('ids')
+        if not os.path.exists(ids_path):
+            return
+        count = min(os.path.getsize(vectors_path) // (self.dimension * 4), os.path.getsize(ids_path) // 8)
+        if count == len(self.ids) and not force:
+            return
+        self.ids = np.fromfile(ids_path, dtype=np.int64, count=count)
+        if count:
+            # a plain ndarray view of the mapping, rows of np.memmap are several times heavier objects
+            self.matrix = np.memmap(vectors_path, dtype=np.float32, mode='r', shape=(count, self.dimension)).view(np.ndarray)
+        else:
+            self.matrix = np.empty((0, self.dimension), dtype=np.float32)
+        # a re-appended article is served by its latest row
+        self.rows = dict(zip(self.ids.tolist(), range(count)))
+
+
+    def get(self, article_id):
+        """
+        Returns:
+            np.ndarray: Read-only view of the vector of the article, None if it is not stored
+        """
+        row = self.rows.get(article_id)
+        return self.matrix[row] if row is not None else None
+
+
+    def append(self, article_ids, vectors):
+        """
+        Add vectors of articles to the end of the store.
+
+        Args:
+            article_ids (list): IDs of the articles
+            vectors (list): Document vector of every article
+        """
+        if not len(article_ids):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(article_ids), -1)
+        with self.__lock():
+            if self.dimension is None:
+                self.dimension = vectors.shape[1]
+                self.__write_meta()
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(f"Vectors of dimension {vectors.shape[1]} can not be added to a store of dimension {self.dimension}")
+            # the row count is read under the lock, so rows appended by other processes are not cut
+            count = len(self.ids)
+            vectors_path, ids_path = self.__file('vectors'), self.__file('ids')
+            for file_path, data, row_size in ((vectors_path, vectors, self.dimension * 4), (ids_path, np.asarray(article_ids, dtype=np.int64), 8)):
+                with open(file_path, 'ab') as f:
+                    # cut a torn tail left by an interrupted append
+                    f.truncate(count * row_size)
+                    f.write(data.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.refresh()
+
+
+    def compact(self, keep_ids=None):
+        """
+        Rewrite the store without superseded rows and, if keep_ids is given, without other articles.
+
+        Processes which opened the store before keep reading the previous generation
+        until they open it again.
+
+        Args:
+            keep_ids (set, optional): IDs of the articles to keep
+
+        Returns:
+            int: Number of dropped rows
+        """
+        with self.__lock():
+            if self.dimension is None:
+                return 0
+            rows = sorted(row for article_id, row in self.rows.items() if keep_ids is None or article_id in keep_ids)
+            previous = (self.__file('vectors'), self.__file('ids'))
+            generation = self.generation + 1
+            self.matrix[rows].tofile(self.__file('vectors', generation))
+            self.ids[rows].tofile(self.__file('ids', generation))
+            dropped = len(self.ids) - len(rows)
+            self.generation = generation
+            self.__write_meta()
+            self.refresh(force=True)
+            for file_path in previous:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            return dropped
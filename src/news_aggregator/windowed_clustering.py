@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from news_db.news_repository import NewsRepository
+from news_db.topic_repository import TopicRepository
+from news_aggregator.nlp_pipeline import MODEL_NAME
+from news_aggregator.feature_cache import FeatureCache
+from news_aggregator.time_windows import window_ends
+from news_aggregator.clustering_backends import group_articles
+from news_aggregator.near_duplicates import link_near_duplicates
+from news_aggregator.text_cleaning import article_clean_text, backfill_clean_text
+from news_aggregator.news_clustering import build_groups
+
+
+def iter_sliding_groups(articles, get_features, horizon, chunk_size=1000, block_size=1024, tile_size=None):
+  """
+  Group a date-sorted stream of articles keeping only one window of articles in memory.
+
+  Articles are read until the window of the next chunk_size seeds is complete,
+  the seeds are grouped with the articles within horizon after them, and then
+  dropped from the buffer. Grouping is the same as in the backfill mode, except
+  that entity weights are computed over the buffer instead of the whole history.
+
+  Args:
+      articles (iterable): Article objects sorted by publication date, newest first
+      get_features (callable): Returns ArticleFeatures for a list of articles
+      horizon (timedelta): Maximum distance in time between compared articles
+      chunk_size (int, optional): Number of seed articles grouped at once
+      block_size (int, optional): Rows per similarity block
+      tile_size (int, optional): Columns per similarity tile
+
+  Yields:
+      tuple: (articles, features) of every group
+  """
+  articles = iter(articles)
+  buffer = []
+  buffer_features = []
+  grouped_ids = set()
+  exhausted = False
+  while True:
+    while not exhausted and (
+      len(buffer) <= chunk_size
+      or buffer[-1].publication_date >= buffer[chunk_size - 1].publication_date - horizon
+    ):
+      article = next(articles, None)
+      if article is None:
+        exhausted = True
+      else:
+        buffer.append(article)
+    if not buffer:
+      return
+    buffer_features.extend(get_features(buffer[len(buffer_features):]))
+
+    seed_count = min(chunk_size, len(buffer))
+    ends = window_ends([article.publication_date for article in buffer], horizon)
+    grouped = {k for k, article in enumerate(buffer) if article.id in grouped_ids}
+    groups = group_articles(buffer_features, block_size, tile_size,
+                            window_ends=ends, seed_count=seed_count, grouped=grouped)
+    for group in groups:
+      grouped_ids.update(buffer[k].id for k in group if k >= seed_count)
+      yield [buffer[k] for k in group], [buffer_features[k] for k in group]
+
+    buffer = buffer[seed_count:]
+    buffer_features = buffer_features[seed_count:]
+    grouped_ids.intersection_update(article.id for article in buffer)
+
+
+def run_sliding_clustering(horizon=timedelta(hours=48), chunk_size=1000, save_batch_size=500,
+                           block_size=1024, tile_size=None, model_name=MODEL_NAME, batch_size=256, n_process=1,
+                           vector_store_path=None):
+  """
+  Cluster the whole history with a sliding time window, keeping only one window of articles in memory.
+
+  Events are written after grouping in one transaction which replaces the events of the previous
+  clustering run, so readers switch from the old result to the new one at once and writers
+  are blocked only while the result is written.
+
+  Args:
+      horizon (timedelta, optional): Maximum distance in time between compared articles
+      chunk_size (int, optional): Number of seed articles grouped at once
+      save_batch_size (int, optional): Number of groups written at once
+      block_size (int, optional): Rows per similarity block
+      tile_size (int, optional): Columns per similarity tile
+      model_name (str, optional): Name of the spaCy model
+      batch_size (int, optional): Number of texts in one nlp.pipe batch
+      n_process (int, optional): Number of nlp.pipe worker processes
+      vector_store_path (str, optional): Directory of a VectorStore serving the document vectors
+  """
+  news_repository = NewsRepository()
+  topic_repository = TopicRepository()
+  feature_cache = FeatureCache(model_name=model_name, batch_size=batch_size, n_process=n_process,
+                               vector_store_path=vector_store_path)
+
+  backfill_clean_text(news_repository)
+  link_near_duplicates(news_repository)
+  news = news_repository.iter_articles_sorted_by_date(exclude_duplicates=True)
+  groups = iter_sliding_groups(news, lambda articles: feature_cache.get_features(articles, article_clean_text),
+                               horizon, chunk_size, block_size, tile_size)
+  group_count = 0
+  article_count = 0
+  # groups are kept as events, article IDs and profiles, which are much smaller than the articles;
+  # the writer is opened only after grouping, so the previous result is locked just while writing
+  batches = []
+  news_groups, features_groups = [], []
+  for news_group, features_group in groups:
+    article_count += len(news_group)
+    news_groups.append(news_group)
+    features_groups.append(features_group)
+    if len(news_groups) >= save_batch_size:
+      batches.append(build_groups(news_groups, features_groups, group_count))
+      group_count += len(news_groups)
+      news_groups, features_groups = [], []
+  batches.append(build_groups(news_groups, features_groups, group_count))
+  group_count += len(news_groups)
+
+  with topic_repository.clustering_result_writer(replace_generated=True) as writer:
+    for batch in batches:
+      writer.save_groups(batch)
+    writer.link_duplicates_to_events()
+  print(f"{article_count} articles, {group_count} groups")
+  print(f"NLP processing: {feature_cache.processed_count} new articles, {feature_cache.throughput():.1f} articles/sec")
@@ -1,3 +1,43 @@
+import argparse
+from datetime import timedelta
 import news_aggregator.news_clustering
+import news_aggregator.incremental_clustering
+import news_aggregator.windowed_clustering
+from news_aggregator.clustering_backends import DBSCANBackend
+from news_aggregator.clustering_diagnostics import ClusteringDiagnostics
+from news_aggregator.feature_cache import FeatureCache
+from news_db.news_repository import NewsRepository
 
-news_aggregator.news_clustering.run_clustering()
+parser = argparse.ArgumentParser()
+parser.add_argument('--incremental', action='store_true', help='cluster only articles added since the previous run')
+parser.add_argument('--sliding', action='store_true', help='cluster the history with a sliding time window')
+parser.add_argument('--backend', choices=['greedy', 'dbscan'], default='greedy', help='clustering algorithm of the batch mode')
+parser.add_argument('--n-jobs', type=int, help='parallel jobs of the dbscan neighbour search')
+parser.add_argument('--horizon-hours', type=float, help='compare only articles published within this many hours')
+parser.add_argument('--diagnostics', help='write compared pairs of sampled articles to this .jsonl or .parquet file')
+parser.add_argument('--diagnostics-sample-rate', type=float, default=0.01, help='share of articles recorded in diagnostics')
+parser.add_argument('--diagnostics-top-k', type=int, default=5, help='most similar compared articles recorded per sampled article')
+parser.add_argument('--vector-store', help='directory of the memory-mapped store of article vectors')
+parser.add_argument('--compact-vector-store', action='store_true', help='drop vectors of removed and duplicate articles from the store and exit')
+args = parser.parse_args()
+horizon = timedelta(hours=args.horizon_hours) if args.horizon_hours else None
+
+if args.compact_vector_store:
+    if not args.vector_store:
+        parser.error('--compact-vector-store requires --vector-store')
+    vector_store = FeatureCache(vector_store_path=args.vector_store).vector_store
+    dropped = vector_store.compact(NewsRepository().get_article_ids(exclude_duplicates=True))
+    print(f"Dropped {dropped} vectors, {len(vector_store)} left")
+elif args.incremental:
+    news_aggregator.incremental_clustering.run_incremental_clustering(vector_store_path=args.vector_store)
+elif args.sliding:
+    news_aggregator.windowed_clustering.run_sliding_clustering(horizon or timedelta(hours=48), vector_store_path=args.vector_store)
+else:
+    if args.diagnostics and args.backend != 'greedy':
+        parser.error('--diagnostics is only supported by the greedy backend')
+    backend = DBSCANBackend(n_jobs=args.n_jobs) if args.backend == 'dbscan' else None
+    diagnostics = None
+    if args.diagnostics:
+        diagnostics = ClusteringDiagnostics(args.diagnostics, args.diagnostics_sample_rate, args.diagnostics_top_k)
+    news_aggregator.news_clustering.run_clustering(horizon=horizon, backend=backend, diagnostics=diagnostics,
+                                                   vector_store_path=args.vector_store)
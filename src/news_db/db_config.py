@@ -1,8 +1,175 @@
 import os
+import threading
+from collections import deque
+import time
 import psycopg2
 from dotenv import load_dotenv
 
 
+class ConnectionPool:
+    def __init__(self, connection_params: dict, min_size: int = 1, max_size: int = 10,
+                 health_check_interval: float = 30.0, timeout: float = 30.0):
+        """
+        Thread-safe pool of database connections.
+
+        Idle connections are kept open up to max_size, and callers wait for a free
+        connection instead of failing when all of them are in use.
+
+        Args:
+            connection_params (dict): Parameters of psycopg2.connect
+            min_size (int, optional): Number of connections opened in advance
+            max_size (int, optional): Maximum number of open connections
+            health_check_interval (float, optional): Connections idle for longer than this many seconds
+                are checked with SELECT 1 before they are handed out
+            timeout (float, optional): Maximum number of seconds to wait for a free connection
+        """
+        self.connection_params = connection_params
+        self.min_size = min_size
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.checkouts = 0
+        self.waits = 0
+        self.failed_health_checks = 0
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._open = 0
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._open += 1
+
+
+    def _connect(self) -> psycopg2.extensions.connection:
+        try:
+            return psycopg2.connect(**self.connection_params)
+        except psycopg2.Error as e:
+            raise Exception(f"Error connecting to database: {e}")
+
+
+    def getconn(self) -> psycopg2.extensions.connection:
+        """Take a healthy connection from the pool, waiting if all connections are in use."""
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            waited = False
+            while not self._idle and self._open >= self.max_size:
+                if not waited:
+                    self.waits += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise Exception(f"Error connecting to database: no free connection in {self.timeout}s")
+            if self._idle:
+                conn, returned_at = self._idle.pop()
+            else:
+                conn, returned_at = None, None
+                self._open += 1
+            self.checkouts += 1
+        try:
+            if conn is not None and self._is_healthy(conn, returned_at):
+                return conn
+            if conn is not None:
+                with self._condition:
+                    self.failed_health_checks += 1
+                conn.close()
+            return self._connect()
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+
+    def putconn(self, conn: psycopg2.extensions.connection, close: bool = False):
+        """Return a connection to the pool, broken connections are closed."""
+        with self._condition:
+            if close or conn.closed:
+                self._open -= 1
+                if not conn.closed:
+                    conn.close()
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+
+    def _is_healthy(self, conn, returned_at) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+
+    def stats(self) -> dict:
+        """
+        Get pool statistics.
+
+        Returns:
+            dict: Number of checkouts, waits for a free connection, failed health checks,
+                open and used connections
+        """
+        with self._condition:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "failed_health_checks": self.failed_health_checks,
+                "open_connections": self._open,
+                "used_connections": self._open - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size
+            }
+
+
+    def closeall(self):
+        """Close all idle connections of the pool."""
+        with self._condition:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                conn.close()
+                self._open -= 1
+
+
+class PooledConnection:
+    def __init__(self, pool: ConnectionPool):
+        """
+        Context manager which behaves like `with connection:` of psycopg2 and returns
+        the connection to the pool afterwards.
+
+        Args:
+            pool (ConnectionPool): Pool to take the connection from
+        """
+        self.pool = pool
+        self.conn = None
+
+    def __enter__(self) -> psycopg2.extensions.connection:
+        self.conn = self.pool.getconn()
+        return self.conn
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        broken = False
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        except psycopg2.Error:
+            broken = True
+            if exc_type is None:
+                raise
+        finally:
+            self.pool.putconn(self.conn, close=broken)
+            self.conn = None
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
 class DatabaseConfig:
     def __init__(self, env_path: str = '.env'):
         load_dotenv(env_path)
@@ -13,9 +180,22 @@ class DatabaseConfig:
             "password": os.getenv("POSTGRES_PASSWORD"),
             "port": os.getenv("POSTGRES_PORT", "5432")
         }
+        self.pool_min_size = int(os.getenv("POSTGRES_POOL_MIN_SIZE", "1"))
+        self.pool_max_size = int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10"))
 
     def create_connection(self) -> psycopg2.extensions.connection:
         try:
             return psycopg2.connect(**self.connection_params)
         except psycopg2.Error as e:
             raise Exception(f"Error connecting to database: {e}")
+
+    def get_pool(self) -> ConnectionPool:
+        """Get the connection pool shared by all repositories with the same connection parameters."""
+        key = tuple(sorted(self.connection_params.items()))
+        with _pools_lock:
+            if key not in _pools:
+                _pools[key] = ConnectionPool(self.connection_params, self.pool_min_size, self.pool_max_size)
+            return _pools[key]
+
+    def pooled_connection(self) -> PooledConnection:
+        return PooledConnection(self.get_pool())
@@ -0,0 +1,97 @@
+from typing import Dict, List, Tuple
+from psycopg2.extras import execute_values
+from news_db.db_config import DatabaseConfig
+
+
+class FeatureRepository:
+    def __init__(self, env_file='.env'):
+        """
+        Initialize the repository with database connection parameters.
+        
+        Args:
+            env_file (str, optional): Path to .env file to load connection parameters from
+        """
+        self.db_config = DatabaseConfig(env_file)
+    
+
+    def get_connection(self):
+        """Take a database connection from the shared pool, it is returned to the pool when the with block ends."""
+        return self.db_config.pooled_connection()
+    
+
+    def get_features(self, model_version: str, article_hashes: List[str]) -> Dict[str, Tuple[bytes, List[str]]]:
+        """
+        Get cached NLP features of articles.
+
+        Args:
+            model_version (str): Name and version of the model the features were computed with
+            article_hashes (list): Hashes of the articles
+
+        Returns:
+            dict: Mapping article_hash -> (vector bytes, entity lemmas) for the cached articles
+        """
+        query = """
+            SELECT article_hash, vector, entities
+            FROM article_features
+            WHERE model_version = %s AND article_hash = ANY(%s)
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (model_version, list(article_hashes)))
+                    return {row[0]: (bytes(row[1]), row[2]) for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Error getting article features: {e}")
+            raise
+    
+
+    def get_entities(self, model_version: str, article_hashes: List[str]) -> Dict[str, List[str]]:
+        """
+        Get cached entity lemmas of articles, for articles whose vectors are stored elsewhere.
+
+        Args:
+            model_version (str): Name and version of the model the features were computed with
+            article_hashes (list): Hashes of the articles
+
+        Returns:
+            dict: Mapping article_hash -> entity lemmas for the cached articles
+        """
+        query = """
+            SELECT article_hash, entities
+            FROM article_features
+            WHERE model_version = %s AND article_hash = ANY(%s)
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (model_version, list(article_hashes)))
+                    return {row[0]: row[1] for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Error getting article entities: {e}")
+            raise
+    
+
+    def save_features(self, model_version: str, features: List[Tuple[str, bytes, List[str]]]):
+        """
+        Save NLP features of articles, already cached articles are skipped.
+
+        Args:
+            model_version (str): Name and version of the model the features were computed with
+            features (list): Tuples (article_hash, vector bytes, entity lemmas)
+        """
+        insert_query = """
+            INSERT INTO article_features (model_version, article_hash, vector, entities)
+            VALUES %s ON CONFLICT DO NOTHING
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    execute_values(
+                        cursor,
+                        insert_query,
+                        [(model_version, article_hash, vector, entities) for article_hash, vector, entities in features]
+                    )
+                    conn.commit()
+        except Exception as e:
+            print(f"Error saving article features: {e}")
+            raise
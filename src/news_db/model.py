@@ -1,27 +1,52 @@
 import hashlib
 
 class Source:
-    def __init__(self, id, key, name, latest_publication_date=None, earliest_publication_date=None, tg_channel=None):
+    def __init__(self, id, key, name, latest_publication_date=None, earliest_publication_date=None, tg_channel=None,
+                 latest_message_id=None, rss_url=None, rss_etag=None, rss_last_modified=None):
         self.id = id
         self.key = key
         self.name = name
         self.latest_publication_date = latest_publication_date
         self.earliest_publication_date = earliest_publication_date
         self.tg_channel = tg_channel
+        self.latest_message_id = latest_message_id
+        self.rss_url = rss_url
+        self.rss_etag = rss_etag
+        self.rss_last_modified = rss_last_modified
+
+    def add_publication_date(self, date, message_id=None):
+        """Extend the publication dates of the source with a fetched item, message_id is its Telegram message"""
+        date = date.replace(tzinfo=None)
+        if not self.latest_publication_date or date > self.latest_publication_date:
+            self.latest_publication_date = date
+            if message_id:
+                self.latest_message_id = message_id
+        if not self.earliest_publication_date or date < self.earliest_publication_date:
+            self.earliest_publication_date = date
 
 
 class Article:
-    def __init__(self, id, name, text, publication_date, source_id, article_hash=None):
+    # formatted_date is filled by news_explorer views
+    __slots__ = ('id', 'name', 'text', 'publication_date', 'source_id', '_article_hash', 'clean_text', 'formatted_date')
+
+    def __init__(self, id, name, text, publication_date, source_id, article_hash=None, clean_text=None):
         self.id = id
         self.name = name
         self.text = text
         self.publication_date = publication_date
         self.source_id = source_id
-        if article_hash is None:
+        self._article_hash = article_hash
+        # plain text without markup, set at ingest
+        self.clean_text = clean_text
+
+    @property
+    def article_hash(self):
+        # rows read from the database carry the stored hash, so it is only computed for new articles
+        if self._article_hash is None:
             hash_object = hashlib.md5()
-            hash_object.update((name + text + str(publication_date)).encode('utf-8'))
-            article_hash = hash_object.hexdigest()
-        self.article_hash = article_hash
+            hash_object.update((self.name + self.text + str(self.publication_date)).encode('utf-8'))
+            self._article_hash = hash_object.hexdigest()
+        return self._article_hash
 
     def __repr__(self) -> str:
         return f"Article(id={self.id}, name='{self.name}', source_id={self.source_id})"
@@ -39,16 +64,30 @@ class Topic:
 
 
 class Event:
-    def __init__(self, id, name, summary=None, topic_id=None):
+    def __init__(self, id, name, summary=None, topic_id=None, generated=False):
         self.id = id
         self.name = name
         self.summary = summary
         self.topic_id = topic_id
+        # created by clustering and replaced by the next full clustering run
+        self.generated = generated
 
     def __repr__(self) -> str:
         return f"Event(id={self.id}, name='{self.name}', topic={self.topic_id})"
 
 
+class EventProfile:
+    def __init__(self, event_id, vector_sum, entities, article_count, latest_publication_date=None):
+        self.event_id = event_id
+        self.vector_sum = vector_sum
+        self.entities = entities
+        self.article_count = article_count
+        self.latest_publication_date = latest_publication_date
+
+    def __repr__(self) -> str:
+        return f"EventProfile(event_id={self.event_id}, article_count={self.article_count})"
+
+
 class ArticleToEvent:
     def __init__(self, id, article_id, event_id):
         self.id = id
@@ -1,10 +1,34 @@
-from typing import List
+from typing import Iterable, List
+import re
+import select
 import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import execute_values
 import os
 from dotenv import load_dotenv
 from news_db.model import Article, Source
 from news_db.db_config import DatabaseConfig
 
+
+# words of a search text, anything else could break the tsquery syntax
+SEARCH_WORD_PATTERN = re.compile(r'\w+')
+# a shorter prefix matches too many words to be useful in typeahead
+SEARCH_MIN_PREFIX_LENGTH = 3
+# search results carry only the beginning of the clean text, enough for a preview
+SEARCH_SNIPPET_LENGTH = 200
+# one page of the date-sorted article listing, also run by benchmarks.index_benchmark
+ARTICLES_PAGE_QUERY = """
+    SELECT a.id, a.article_name, a.article_text, a.publication_date, a.source_id, a.article_hash
+    FROM article a
+    WHERE (%(before_date)s::timestamp IS NULL OR (a.publication_date, a.id) < (%(before_date)s, %(before_id)s))
+      AND (%(date_from)s::timestamp IS NULL OR a.publication_date >= %(date_from)s)
+      AND (%(date_to)s::timestamp IS NULL OR a.publication_date < %(date_to)s)
+      AND (%(source_ids)s::bigint[] IS NULL OR a.source_id = ANY(%(source_ids)s))
+    ORDER BY a.publication_date DESC, a.id DESC
+    LIMIT %(limit)s
+"""
+
+
 class NewsRepository:
     def __init__(self, env_file='.env'):
         """
@@ -17,8 +41,8 @@ class NewsRepository:
     
 
     def get_connection(self):
-        """Create and return a database connection."""
-        return self.db_config.create_connection()
+        """Take a database connection from the shared pool, it is returned to the pool when the with block ends."""
+        return self.db_config.pooled_connection()
     
 
     def add_article(self, article: Article):
@@ -29,34 +53,118 @@ class NewsRepository:
             article (Article): The article object to be added
             
         Returns:
-            int: The ID of the newly inserted article
+            int: The ID of the newly inserted article, None if the article already exists
         """
-        insert_query = """
-            INSERT INTO article (article_name, article_text, publication_date, source_id, article_hash)
-            SELECT %s, %s, %s, %s, %s WHERE NOT EXISTS (
-                SELECT 1 FROM article WHERE article_hash = %s AND publication_date = %s AND source_id = %s
-            )
-            RETURNING id
+        article_ids = self.add_articles([article])
+        return article_ids[0] if article_ids else None
+    
+
+    def add_articles(self, articles: Iterable[Article], page_size: int = 500) -> List[int]:
+        """
+        Add articles to the database in one transaction with multi-row inserts.
+        Articles already stored with the same source, hash and publication date are skipped.
+
+        Args:
+            articles (Iterable[Article]): The article objects to be added
+            page_size (int, optional): Number of rows in one INSERT statement
+
+        Returns:
+            List[int]: IDs of the actually inserted articles
         """
-        
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(
-                        insert_query, 
-                        (article.name, article.text, article.publication_date, article.source_id, article.article_hash,
-                         article.article_hash, article.publication_date, article.source_id)
-                    )
-                    article_id = cursor.fetchone()
-                    conn.commit()
-                    if article_id:
-                        return article_id[0]
-                    return None
+                    return self._insert_articles(cursor, articles, page_size)
         except Exception as e:
-            print(f"Error adding article: {e}")
+            print(f"Error adding articles: {e}")
             raise
     
 
+    def save_fetched_articles(self, source: Source, articles: Iterable[Article], page_size: int = 500,
+                              notify_channel: str = None) -> List[int]:
+        """
+        Add fetched articles and advance the fetch checkpoint of their source in one transaction,
+        so an interrupted fetch resumes right after the last saved batch.
+
+        Args:
+            source (Source): The source with checkpoint fields already advanced past the articles
+            articles (Iterable[Article]): The article objects to be added
+            page_size (int, optional): Number of rows in one INSERT statement
+            notify_channel (str, optional): Postgres NOTIFY channel to send the inserted IDs to on commit
+
+        Returns:
+            List[int]: IDs of the actually inserted articles
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    article_ids = self._insert_articles(cursor, articles, page_size)
+                    self._update_source(cursor, source)
+                    if notify_channel and article_ids:
+                        self._notify_articles(cursor, notify_channel, article_ids)
+                    return article_ids
+        except Exception as e:
+            print(f"Error saving fetched articles: {e}")
+            raise
+
+
+    def _notify_articles(self, cursor, channel: str, article_ids: List[int]):
+        # NOTIFY payloads are limited to 8000 bytes
+        ids_per_payload = 400
+        for start in range(0, len(article_ids), ids_per_payload):
+            payload = ','.join(str(article_id) for article_id in article_ids[start:start + ids_per_payload])
+            cursor.execute("SELECT pg_notify(%s, %s)", (channel, payload))
+
+
+    def listen_new_articles(self, channel: str, timeout: float = None):
+        """
+        Wait for IDs of new articles sent with save_fetched_articles(notify_channel=...).
+        A dedicated connection is kept open while the generator is used.
+
+        Args:
+            channel (str): Postgres NOTIFY channel
+            timeout (float, optional): Stop after this many seconds without notifications, None to wait forever
+
+        Yields:
+            List[int]: IDs of articles inserted in one transaction
+        """
+        conn = self.db_config.create_connection()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+            while True:
+                if select.select([conn], [], [], timeout) == ([], [], []):
+                    return
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    yield [int(article_id) for article_id in notify.payload.split(',')]
+        except Exception as e:
+            print(f"Error listening for new articles: {e}")
+            raise
+        finally:
+            conn.close()
+
+
+    def _insert_articles(self, cursor, articles: Iterable[Article], page_size: int) -> List[int]:
+        insert_query = """
+            INSERT INTO article (article_name, article_text, publication_date, source_id, article_hash, clean_text)
+            VALUES %s
+            ON CONFLICT (source_id, article_hash, publication_date) DO NOTHING
+            RETURNING id
+        """
+        rows = [
+            (article.name, article.text, article.publication_date, article.source_id, article.article_hash,
+             article.clean_text)
+            for article in articles
+        ]
+        if not rows:
+            return []
+        inserted = execute_values(cursor, insert_query, rows, page_size=page_size, fetch=True)
+        return [row[0] for row in inserted]
+    
+
     def update_source(self, source: Source):
         """
         Update an existing source in the database.
@@ -64,20 +172,24 @@ class NewsRepository:
         Args:
             source (Source): The source object to be updated
         """
-        update_query = """
-            UPDATE source
-            SET latest_publication_date = %s, earliest_publication_date = %s
-            WHERE id = %s
-        """
-
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(update_query, (source.latest_publication_date, source.earliest_publication_date, source.id))
-                    conn.commit()
+                    self._update_source(cursor, source)
         except Exception as e:
             print(f"Error updating source: {e}")
             raise
+
+
+    def _update_source(self, cursor, source: Source):
+        update_query = """
+            UPDATE source
+            SET latest_publication_date = %s, earliest_publication_date = %s, latest_message_id = %s,
+                rss_etag = %s, rss_last_modified = %s
+            WHERE id = %s
+        """
+        cursor.execute(update_query, (source.latest_publication_date, source.earliest_publication_date,
+                                      source.latest_message_id, source.rss_etag, source.rss_last_modified, source.id))
     
 
     def get_source_tg_channel(self, source_id: int) -> str:
@@ -111,7 +223,11 @@ class NewsRepository:
         Returns:
             List[Source]: A list of all sources
         """
-        query = "SELECT id, source_key, source_name, latest_publication_date, earliest_publication_date, tg_channel FROM source"
+        query = """
+            SELECT id, source_key, source_name, latest_publication_date, earliest_publication_date, tg_channel, latest_message_id,
+                   rss_url, rss_etag, rss_last_modified
+            FROM source
+        """
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
@@ -121,29 +237,40 @@ class NewsRepository:
                     sources = []
                     for result in results:
                         sources.append(Source(id=result[0], key=result[1], name=result[2],
-                                               latest_publication_date=result[3], earliest_publication_date=result[4], tg_channel=result[5]))
+                                               latest_publication_date=result[3], earliest_publication_date=result[4], tg_channel=result[5],
+                                               latest_message_id=result[6], rss_url=result[7], rss_etag=result[8],
+                                               rss_last_modified=result[9]))
                     return sources
         except Exception as e:
             print(f"Error getting sources: {e}")
             raise
     
 
-    def get_all_articles_sorted_by_date(self):
+    def get_all_articles_sorted_by_date(self, exclude_duplicates: bool = False, with_text: bool = True):
         """
         Retrieves all articles from the database sorted by publication date (newest first)
         
+        Args:
+            exclude_duplicates (bool, optional): Skip articles linked as near duplicates of another article
+            with_text (bool, optional): Load the texts, otherwise the articles have only the header columns
+                and the texts can be loaded later with get_article_texts
+
         Returns:
             list: List of Article objects sorted by publication date
         """
-        query = """
-            SELECT a.id, a.article_name, a.article_text, a.publication_date, a.source_id
+        query = sql.SQL("""
+            SELECT a.id, a.article_name, {texts}, a.publication_date, a.source_id, a.article_hash, {clean_texts}
             FROM article a
+            WHERE NOT %s OR a.duplicate_of IS NULL
             ORDER BY a.publication_date DESC
-        """
+        """).format(
+            texts=sql.SQL('a.article_text' if with_text else 'NULL'),
+            clean_texts=sql.SQL('a.clean_text' if with_text else 'NULL')
+        )
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(query)
+                    cursor.execute(query, (exclude_duplicates,))
                     articles = []
                     for row in cursor.fetchall():
                         article = Article(
@@ -151,7 +278,9 @@ class NewsRepository:
                             name=row[1],
                             text=row[2],
                             publication_date=row[3],
-                            source_id=row[4]
+                            source_id=row[4],
+                            article_hash=row[5],
+                            clean_text=row[6]
                         )
                         articles.append(article)
                     return articles
@@ -159,3 +288,417 @@ class NewsRepository:
             print(f"Error getting sources: {e}")
             raise
         cursor = self.connection.cursor()
+    
+
+    def get_article_texts(self, article_ids: List[int]) -> dict:
+        """
+        Retrieves texts of articles loaded without them
+
+        Args:
+            article_ids (List[int]): IDs of the articles
+
+        Returns:
+            dict: Tuples (text, clean_text) by article ID, the raw text is loaded only for articles without clean_text
+        """
+        query = """
+            SELECT a.id, CASE WHEN a.clean_text IS NULL THEN a.article_text END, a.clean_text
+            FROM article a
+            WHERE a.id = ANY(%s)
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (list(article_ids),))
+                    return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Error getting article texts: {e}")
+            raise
+
+
+    def get_article_ids(self, exclude_duplicates: bool = False) -> set:
+        """
+        Retrieves IDs of all articles
+
+        Args:
+            exclude_duplicates (bool, optional): Skip articles linked as near duplicates of another article
+
+        Returns:
+            set: Article IDs
+        """
+        query = """
+            SELECT a.id
+            FROM article a
+            WHERE NOT %s OR a.duplicate_of IS NULL
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (exclude_duplicates,))
+                    return {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Error getting article ids: {e}")
+            raise
+
+
+    def iter_articles_sorted_by_date(self, date_from=None, date_to=None, source_ids=None, itersize: int = 2000,
+                                     exclude_duplicates: bool = False):
+        """
+        Lazily iterates over articles sorted by publication date (newest first) using a server-side cursor,
+        so only itersize rows are held in memory at once. The pooled connection is held until the iteration ends
+
+        Args:
+            date_from (datetime, optional): Only articles published at or after this date
+            date_to (datetime, optional): Only articles published before this date
+            source_ids (list, optional): Only articles of these sources
+            itersize (int, optional): Number of rows fetched from the server per round trip
+            exclude_duplicates (bool, optional): Skip articles linked as near duplicates of another article
+
+        Yields:
+            Article: Articles sorted by publication date
+        """
+        query = """
+            SELECT a.id, a.article_name, a.article_text, a.publication_date, a.source_id, a.article_hash, a.clean_text
+            FROM article a
+            WHERE (%(date_from)s::timestamp IS NULL OR a.publication_date >= %(date_from)s)
+              AND (%(date_to)s::timestamp IS NULL OR a.publication_date < %(date_to)s)
+              AND (%(source_ids)s::bigint[] IS NULL OR a.source_id = ANY(%(source_ids)s))
+              AND (NOT %(exclude_duplicates)s OR a.duplicate_of IS NULL)
+            ORDER BY a.publication_date DESC
+        """
+        params = {
+            'date_from': date_from,
+            'date_to': date_to,
+            'source_ids': list(source_ids) if source_ids is not None else None,
+            'exclude_duplicates': exclude_duplicates
+        }
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(name='iter_articles_sorted_by_date') as cursor:
+                    cursor.itersize = itersize
+                    cursor.execute(query, params)
+                    for row in cursor:
+                        yield Article(
+                            id=row[0],
+                            name=row[1],
+                            text=row[2],
+                            publication_date=row[3],
+                            source_id=row[4],
+                            article_hash=row[5],
+                            clean_text=row[6]
+                        )
+        except Exception as e:
+            print(f"Error iterating articles: {e}")
+            raise
+    
+
+    def get_articles_page(self, limit: int = 50, before_date=None, before_id: int = None,
+                          date_from=None, date_to=None, source_ids=None) -> List[Article]:
+        """
+        Retrieves one page of articles sorted by publication date and ID (newest first) using keyset pagination
+
+        Args:
+            limit (int, optional): Maximum number of articles in the page
+            before_date (datetime, optional): Publication date of the last article of the previous page
+            before_id (int, optional): ID of the last article of the previous page
+            date_from (datetime, optional): Only articles published at or after this date
+            date_to (datetime, optional): Only articles published before this date
+            source_ids (list, optional): Only articles of these sources
+
+        Returns:
+            list: List of Article objects published before (before_date, before_id)
+        """
+        params = {
+            'before_date': before_date,
+            'before_id': before_id if before_id is not None else 2 ** 63 - 1,
+            'date_from': date_from,
+            'date_to': date_to,
+            'source_ids': list(source_ids) if source_ids is not None else None,
+            'limit': limit
+        }
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(ARTICLES_PAGE_QUERY, params)
+                    articles = []
+                    for row in cursor.fetchall():
+                        article = Article(
+                            id=row[0],
+                            name=row[1],
+                            text=row[2],
+                            publication_date=row[3],
+                            source_id=row[4],
+                            article_hash=row[5]
+                        )
+                        articles.append(article)
+                    return articles
+        except Exception as e:
+            print(f"Error getting articles page: {e}")
+            raise
+    
+
+    def search_articles(self, text: str, limit: int = 20, before_rank: float = None, before_id: int = None,
+                        max_id: int = None, date_from=None, date_to=None, source_ids=None,
+                        exclude_duplicates: bool = False, candidate_limit: int = 1000) -> tuple:
+        """
+        Full-text search of articles sorted by relevance and ID using keyset pagination
+
+        All words of the text must be found in an article, the last word also as a prefix
+        of at least SEARCH_MIN_PREFIX_LENGTH letters, so the method serves both search and typeahead. Only the newest candidate_limit
+        matching articles are ranked: ranking every match of a frequent word takes seconds
+        on a million articles, while the newest matches are found by a backward scan of the
+        primary key. Pages of one search are taken from the same candidates, bounded by max_id
+        of the first page. The texts of the found articles are not loaded, only a snippet of the
+        first SEARCH_SNIPPET_LENGTH characters of the clean text. A search with more matches
+        than candidate_limit is reported as truncated, so the caller can ask for a narrower text.
+
+        Args:
+            text (str): Search text
+            limit (int, optional): Maximum number of articles in the page
+            before_rank (float, optional): Rank of the last article of the previous page
+            before_id (int, optional): ID of the last article of the previous page
+            max_id (int, optional): Newest candidate of the first page, returned with every page
+            date_from (datetime, optional): Only articles published at or after this date
+            date_to (datetime, optional): Only articles published before this date
+            source_ids (list, optional): Only articles of these sources
+            exclude_duplicates (bool, optional): Skip articles linked as near duplicates of another article
+            candidate_limit (int, optional): Number of newest matching articles which are ranked
+
+        Returns:
+            tuple: (list of tuples (Article without text, snippet, rank) ranked below (before_rank, before_id), max_id,
+                whether older matches were not ranked)
+        """
+        words = SEARCH_WORD_PATTERN.findall(text.lower())
+        if not words:
+            return [], max_id, False
+        if len(words[-1]) >= SEARCH_MIN_PREFIX_LENGTH:
+            words[-1] += ':*'
+        query = """
+            WITH candidates AS MATERIALIZED (
+                SELECT a.id, a.search_vector
+                FROM article a
+                WHERE a.search_vector @@ to_tsquery('russian', %(query)s)
+                  AND (%(max_id)s::bigint IS NULL OR a.id <= %(max_id)s)
+                  AND (%(date_from)s::timestamp IS NULL OR a.publication_date >= %(date_from)s)
+                  AND (%(date_to)s::timestamp IS NULL OR a.publication_date < %(date_to)s)
+                  AND (%(source_ids)s::bigint[] IS NULL OR a.source_id = ANY(%(source_ids)s))
+                  AND (NOT %(exclude_duplicates)s OR a.duplicate_of IS NULL)
+                ORDER BY a.id DESC
+                LIMIT %(candidate_limit)s
+            ), ranked AS (
+                SELECT c.id, ts_rank(c.search_vector, to_tsquery('russian', %(query)s)) AS rank
+                FROM candidates c
+            )
+            SELECT a.id, a.article_name, a.publication_date, a.source_id, a.article_hash,
+                   left(coalesce(a.clean_text, a.article_name), %(snippet_length)s),
+                   r.rank, (SELECT max(id) FROM candidates),
+                   (SELECT count(*) FROM candidates) >= %(candidate_limit)s
+            FROM ranked r
+            JOIN article a ON a.id = r.id
+            WHERE %(before_rank)s::real IS NULL OR (r.rank, r.id) < (%(before_rank)s::real, %(before_id)s)
+            ORDER BY r.rank DESC, r.id DESC
+            LIMIT %(limit)s
+        """
+        params = {
+            'query': ' & '.join(words),
+            'before_rank': before_rank,
+            'before_id': before_id if before_id is not None else 2 ** 63 - 1,
+            'max_id': max_id,
+            'date_from': date_from,
+            'date_to': date_to,
+            'source_ids': list(source_ids) if source_ids is not None else None,
+            'exclude_duplicates': exclude_duplicates,
+            'candidate_limit': candidate_limit,
+            'snippet_length': SEARCH_SNIPPET_LENGTH,
+            'limit': limit
+        }
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    rows = cursor.fetchall()
+                    results = [
+                        (Article(id=row[0], name=row[1], text=None, publication_date=row[2], source_id=row[3],
+                                 article_hash=row[4]), row[5], row[6])
+                        for row in rows
+                    ]
+                    if not rows:
+                        return results, max_id, False
+                    return results, rows[0][7], rows[0][8]
+        except Exception as e:
+            print(f"Error searching articles: {e}")
+            raise
+    
+
+    def get_unclustered_articles(self, exclude_duplicates: bool = False) -> List[Article]:
+        """
+        Retrieves articles not linked to any event sorted by publication date (newest first)
+
+        Args:
+            exclude_duplicates (bool, optional): Skip articles linked as near duplicates of another article
+
+        Returns:
+            list: List of Article objects sorted by publication date
+        """
+        query = """
+            SELECT a.id, a.article_name, a.article_text, a.publication_date, a.source_id, a.article_hash, a.clean_text
+            FROM article a
+            WHERE NOT a.clustered
+              AND (NOT %s OR a.duplicate_of IS NULL)
+            ORDER BY a.publication_date DESC
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (exclude_duplicates,))
+                    articles = []
+                    for row in cursor.fetchall():
+                        article = Article(
+                            id=row[0],
+                            name=row[1],
+                            text=row[2],
+                            publication_date=row[3],
+                            source_id=row[4],
+                            article_hash=row[5],
+                            clean_text=row[6]
+                        )
+                        articles.append(article)
+                    return articles
+        except Exception as e:
+            print(f"Error getting articles: {e}")
+            raise
+
+
+    def get_unsigned_articles(self, limit: int = 1000) -> List[Article]:
+        """
+        Retrieves articles without a near-duplicate signature in the order they were added
+
+        Args:
+            limit (int, optional): Maximum number of articles
+
+        Returns:
+            list: List of Article objects sorted by ID
+        """
+        query = """
+            SELECT a.id, a.article_name, a.article_text, a.publication_date, a.source_id, a.article_hash, a.clean_text
+            FROM article a
+            WHERE a.minhash IS NULL
+            ORDER BY a.id
+            LIMIT %s
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (limit,))
+                    return [
+                        Article(id=row[0], name=row[1], text=row[2], publication_date=row[3],
+                                source_id=row[4], article_hash=row[5], clean_text=row[6])
+                        for row in cursor.fetchall()
+                    ]
+        except Exception as e:
+            print(f"Error getting unsigned articles: {e}")
+            raise
+
+
+    def get_article_signatures(self, date_from, date_to) -> List[tuple]:
+        """
+        Retrieves stored near-duplicate signatures of articles published within a period
+
+        Args:
+            date_from (datetime): Only articles published at or after this date
+            date_to (datetime): Only articles published at or before this date
+
+        Returns:
+            list: Tuples (article_id, publication_date, minhash bytes, duplicate_of)
+        """
+        query = """
+            SELECT a.id, a.publication_date, a.minhash, a.duplicate_of
+            FROM article a
+            WHERE a.publication_date BETWEEN %s AND %s AND length(a.minhash) > 0
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (date_from, date_to))
+                    return [(row[0], row[1], bytes(row[2]), row[3]) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error getting article signatures: {e}")
+            raise
+
+
+    def save_article_signatures(self, signatures: Iterable[tuple], page_size: int = 500):
+        """
+        Store near-duplicate signatures and links of articles in one transaction
+
+        Args:
+            signatures (Iterable[tuple]): Tuples (article_id, minhash bytes, duplicate_of or None),
+                empty bytes mark articles without text to sign
+            page_size (int, optional): Number of rows in one UPDATE statement
+        """
+        update_query = """
+            UPDATE article a
+            SET minhash = v.minhash, duplicate_of = v.duplicate_of
+            FROM (VALUES %s) AS v(id, minhash, duplicate_of)
+            WHERE a.id = v.id
+        """
+        rows = [(article_id, psycopg2.Binary(minhash), duplicate_of) for article_id, minhash, duplicate_of in signatures]
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    execute_values(cursor, update_query, rows, template="(%s, %s::bytea, %s::bigint)", page_size=page_size)
+        except Exception as e:
+            print(f"Error saving article signatures: {e}")
+            raise
+
+
+    def get_articles_without_clean_text(self, limit: int = 1000) -> List[Article]:
+        """
+        Retrieves articles stored without the cleaned plain text
+
+        Args:
+            limit (int, optional): Maximum number of articles
+
+        Returns:
+            list: List of Article objects sorted by ID
+        """
+        query = """
+            SELECT a.id, a.article_name, a.article_text, a.publication_date, a.source_id, a.article_hash
+            FROM article a
+            WHERE a.clean_text IS NULL
+            ORDER BY a.id
+            LIMIT %s
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, (limit,))
+                    return [
+                        Article(id=row[0], name=row[1], text=row[2], publication_date=row[3],
+                                source_id=row[4], article_hash=row[5])
+                        for row in cursor.fetchall()
+                    ]
+        except Exception as e:
+            print(f"Error getting articles without clean text: {e}")
+            raise
+
+
+    def save_clean_texts(self, clean_texts: Iterable[tuple], page_size: int = 500):
+        """
+        Store cleaned plain texts of articles in one transaction
+
+        Args:
+            clean_texts (Iterable[tuple]): Tuples (article_id, clean_text)
+            page_size (int, optional): Number of rows in one UPDATE statement
+        """
+        update_query = """
+            UPDATE article a
+            SET clean_text = v.clean_text
+            FROM (VALUES %s) AS v(id, clean_text)
+            WHERE a.id = v.id
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    execute_values(cursor, update_query, list(clean_texts), page_size=page_size)
+        except Exception as e:
+            print(f"Error saving clean texts: {e}")
+            raise
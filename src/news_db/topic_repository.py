@@ -1,5 +1,6 @@
+from psycopg2.extras import execute_values
 from news_db.db_config import DatabaseConfig
-from news_db.model import Topic, Event, ArticleToEvent, Article
+from news_db.model import Topic, Event, ArticleToEvent, Article, EventProfile
 
 
 class TopicRepository:
@@ -14,8 +15,8 @@ class TopicRepository:
     
 
     def get_connection(self):
-        """Create and return a database connection."""
-        return self.db_config.create_connection()
+        """Take a database connection from the shared pool, it is returned to the pool when the with block ends."""
+        return self.db_config.pooled_connection()
     
 
     def save_event(self, event: Event):
@@ -99,37 +100,76 @@ class TopicRepository:
             INSERT INTO article_to_event (article_id, event_id)
             VALUES (%s, %s) ON CONFLICT DO NOTHING
         """
+        mark_query = "UPDATE article SET clustered = true WHERE id = %s AND NOT clustered"
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(insert_query, (article_to_event.article_id, article_to_event.event_id))
+                    cursor.execute(mark_query, (article_to_event.article_id,))
         except Exception as e:
             print(f"Error creating article_to_event: {e}")
             raise
     
 
-    def get_events_with_topic_and_articles(self):
+    def get_events_with_topic_and_articles(self, preview_length: int = None, limit: int = None, before_id: int = None,
+                                           date_from=None, date_to=None, source_ids=None):
         """
-        Get all events with their associated topics and articles.
+        Get events with their associated topics and articles, newest events first.
+        Events are read with one query and the articles of all events with a second one.
+        Args:
+            preview_length (int, optional): If set, article text is replaced with a preview of
+                at most this many characters of the stored clean text, for listing views
+            limit (int, optional): Maximum number of events, all events if not set
+            before_id (int, optional): Only events with smaller IDs, for keyset pagination
+            date_from (datetime, optional): Only events with articles published at or after this date
+            date_to (datetime, optional): Only events with articles published before this date
+            source_ids (list, optional): Only events with articles of these sources
         Returns:
-            list: A list of dictionaries containing event information
+            list: A list of tuples (event, topic, articles)
         """
         select_event_query = """
             SELECT e.id, e.name, e.summary, t.id, t.name AS topic_name
             FROM event e
             LEFT JOIN topic t ON e.topic_id = t.id
+            WHERE (%(before_id)s::bigint IS NULL OR e.id < %(before_id)s)
+              AND (
+                  %(date_from)s::timestamp IS NULL AND %(date_to)s::timestamp IS NULL AND %(source_ids)s::bigint[] IS NULL
+                  OR EXISTS (
+                      SELECT 1
+                      FROM article_to_event a2e
+                      JOIN article a ON a.id = a2e.article_id
+                      WHERE a2e.event_id = e.id
+                        AND (%(date_from)s::timestamp IS NULL OR a.publication_date >= %(date_from)s)
+                        AND (%(date_to)s::timestamp IS NULL OR a.publication_date < %(date_to)s)
+                        AND (%(source_ids)s::bigint[] IS NULL OR a.source_id = ANY(%(source_ids)s))
+                  )
+              )
+            ORDER BY e.id DESC
+            LIMIT %(limit)s
         """
-        select_articles_for_event_query = """
-            SELECT a.id, a.article_name, a.article_text, a.publication_date, a.source_id
-            FROM article a
-            JOIN article_to_event a2e ON a.id = a2e.article_id
-            WHERE a2e.event_id = %s
+        select_articles_query = """
+            SELECT a2e.event_id, a.id, a.article_name,
+                   CASE WHEN %(preview_length)s::integer IS NULL THEN a.article_text
+                        ELSE left(coalesce(a.clean_text, a.article_name), %(preview_length)s)
+                   END,
+                   a.publication_date, a.source_id, a.article_hash
+            FROM article_to_event a2e
+            JOIN article a ON a.id = a2e.article_id
+            WHERE a2e.event_id = ANY(%(event_ids)s)
+            ORDER BY a2e.event_id, a.publication_date DESC
         """
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(select_event_query)
+                    cursor.execute(select_event_query, {
+                        'before_id': before_id,
+                        'date_from': date_from,
+                        'date_to': date_to,
+                        'source_ids': list(source_ids) if source_ids is not None else None,
+                        'limit': limit
+                    })
                     events = []
+                    articles_by_event = {}
                     for row in cursor.fetchall():
                         event = Event(
                             id = row[0],
@@ -141,18 +181,24 @@ class TopicRepository:
                             id = row[3],
                             name = row[4]
                         )
-                        articles = []
-                        cursor.execute(select_articles_for_event_query, (event.id,))
-                        for article_row in cursor.fetchall():
-                            article = Article(
-                                id = article_row[0],
-                                name = article_row[1],
-                                text = article_row[2],
-                                publication_date = article_row[3],
-                                source_id = article_row[4]
-                            )
-                            articles.append(article)
-                        events.append((event, topic, articles))
+                        articles_by_event[event.id] = []
+                        events.append((event, topic, articles_by_event[event.id]))
+                    if not events:
+                        return events
+                    cursor.execute(select_articles_query, {
+                        'preview_length': preview_length,
+                        'event_ids': list(articles_by_event.keys())
+                    })
+                    for article_row in cursor.fetchall():
+                        article = Article(
+                            id = article_row[1],
+                            name = article_row[2],
+                            text = article_row[3],
+                            publication_date = article_row[4],
+                            source_id = article_row[5],
+                            article_hash = article_row[6]
+                        )
+                        articles_by_event[article_row[0]].append(article)
                     return events
         except Exception as e:
             print(f"Error getting events with topics and articles: {e}")
@@ -250,3 +296,216 @@ class TopicRepository:
         except Exception as e:
             print(f"Error getting event by ID: {e}")
             raise
+    
+
+    def get_event_profiles(self, since=None):
+        """
+        Get centroid and entity profiles of events.
+        Args:
+            since (datetime, optional): Only events with articles published after this date
+        Returns:
+            list: A list of EventProfile objects
+        """
+        select_query = """
+            SELECT event_id, vector_sum, entities, article_count, latest_publication_date
+            FROM event_profile
+            WHERE %(since)s::timestamp IS NULL OR latest_publication_date >= %(since)s
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(select_query, {'since': since})
+                    profiles = []
+                    for row in cursor.fetchall():
+                        profile = EventProfile(
+                            event_id = row[0],
+                            vector_sum = bytes(row[1]),
+                            entities = row[2],
+                            article_count = row[3],
+                            latest_publication_date = row[4]
+                        )
+                        profiles.append(profile)
+                    return profiles
+        except Exception as e:
+            print(f"Error getting event profiles: {e}")
+            raise
+    
+
+    def _upsert_event_profiles(self, cursor, profiles, page_size: int = 100):
+        upsert_query = """
+            INSERT INTO event_profile (event_id, vector_sum, entities, article_count, latest_publication_date)
+            VALUES %s
+            ON CONFLICT (event_id) DO UPDATE SET
+                vector_sum = EXCLUDED.vector_sum,
+                entities = EXCLUDED.entities,
+                article_count = EXCLUDED.article_count,
+                latest_publication_date = EXCLUDED.latest_publication_date
+        """
+        execute_values(cursor, upsert_query, [
+            (p.event_id, p.vector_sum, p.entities, p.article_count, p.latest_publication_date)
+            for p in profiles
+        ], page_size=page_size)
+    
+
+    def link_duplicates_to_events(self) -> int:
+        """
+        Add near-duplicate articles, which are skipped by clustering, to the events of their original articles.
+        Returns:
+            int: Number of added links
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    count = self._link_duplicates_to_events(cursor)
+                    self._mark_clustered(cursor)
+                    return count
+        except Exception as e:
+            print(f"Error linking duplicates to events: {e}")
+            raise
+
+
+    def _link_duplicates_to_events(self, cursor) -> int:
+        insert_query = """
+            INSERT INTO article_to_event (article_id, event_id)
+            SELECT a.id, a2e.event_id
+            FROM article a
+            JOIN article_to_event a2e ON a2e.article_id = a.duplicate_of
+            WHERE a.duplicate_of IS NOT NULL
+            ON CONFLICT (article_id, event_id) DO NOTHING
+        """
+        cursor.execute(insert_query)
+        return cursor.rowcount
+
+
+    def _mark_clustered(self, cursor):
+        # only unclustered articles are checked, they are found with a partial index
+        cursor.execute("""
+            UPDATE article a
+            SET clustered = true
+            WHERE NOT a.clustered
+              AND EXISTS (SELECT 1 FROM article_to_event a2e WHERE a2e.article_id = a.id)
+        """)
+
+
+    def clustering_result_writer(self, replace_generated: bool = False, page_size: int = 1000):
+        """
+        Open a transaction to write a clustering result in parts, see ClusteringResultWriter.
+        Args:
+            replace_generated (bool, optional): Delete all events generated by previous clustering runs,
+                readers see the old events until the new ones are committed
+            page_size (int, optional): Number of rows in one INSERT statement
+        Returns:
+            ClusteringResultWriter: Context manager which commits the whole result on exit
+        """
+        return ClusteringResultWriter(self, replace_generated, page_size)
+
+
+    def save_clustering_result(self, groups, replace_generated: bool = False, page_size: int = 1000):
+        """
+        Save events, their article links and profiles in one transaction with multi-row inserts.
+        Args:
+            groups (list): Tuples (event, article IDs, profile or None), events without ID are created
+            replace_generated (bool, optional): Delete all events generated by previous clustering runs
+            page_size (int, optional): Number of rows in one INSERT statement
+        Returns:
+            list: Event IDs of the groups
+        """
+        with self.clustering_result_writer(replace_generated, page_size) as writer:
+            event_ids = writer.save_groups(groups)
+            writer.link_duplicates_to_events()
+            return event_ids
+
+
+class ClusteringResultWriter:
+    def __init__(self, topic_repository: TopicRepository, replace_generated: bool = False, page_size: int = 1000):
+        """
+        Write a clustering result in parts within one transaction, so readers never see
+        a partially saved result and a failed run leaves the previous result untouched.
+        Args:
+            topic_repository (TopicRepository): Repository to take the connection from
+            replace_generated (bool, optional): Delete all events generated by previous clustering runs
+            page_size (int, optional): Number of rows in one INSERT statement
+        """
+        self.topic_repository = topic_repository
+        self.replace_generated = replace_generated
+        self.page_size = page_size
+        self.connection = None
+        self.cursor = None
+
+
+    def __enter__(self):
+        self.connection = self.topic_repository.get_connection()
+        conn = self.connection.__enter__()
+        try:
+            self.cursor = conn.cursor()
+            if self.replace_generated:
+                self.__delete_generated_events()
+        except BaseException as e:
+            print(f"Error saving clustering result: {e}")
+            self.connection.__exit__(type(e), e, e.__traceback__)
+            raise
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            try:
+                # articles linked by this result are marked once, not per written part
+                self.topic_repository._mark_clustered(self.cursor)
+            except BaseException as e:
+                self.__exit__(type(e), e, e.__traceback__)
+                raise
+        if exc_type is not None:
+            print(f"Error saving clustering result: {exc_value}")
+        self.cursor.close()
+        return self.connection.__exit__(exc_type, exc_value, traceback)
+
+
+    def __delete_generated_events(self):
+        generated_events = "SELECT id FROM event WHERE generated"
+        self.cursor.execute(f"DELETE FROM article_to_event WHERE event_id IN ({generated_events})")
+        self.cursor.execute(f"DELETE FROM event_profile WHERE event_id IN ({generated_events})")
+        self.cursor.execute("DELETE FROM event WHERE generated")
+
+
+    def save_groups(self, groups):
+        """
+        Create the events of the groups without ID and link the articles to the events.
+        Args:
+            groups (list): Tuples (event, article IDs, profile or None), IDs are set on the events
+                and profiles in place
+        Returns:
+            list: Event IDs of the groups
+        """
+        new_events = [event for event, _, _ in groups if event.id is None]
+        if new_events:
+            # IDs are taken from the sequence first, so rows can be inserted without RETURNING
+            self.cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence('event', 'id')) FROM generate_series(1, %s)", (len(new_events),)
+            )
+            for event, (event_id,) in zip(new_events, self.cursor.fetchall()):
+                event.id = event_id
+            execute_values(self.cursor, """
+                INSERT INTO event (id, name, summary, topic_id, generated) VALUES %s
+            """, [(e.id, e.name, e.summary, e.topic_id, e.generated) for e in new_events], page_size=self.page_size)
+
+        links = [(article_id, event.id) for event, article_ids, _ in groups for article_id in article_ids]
+        execute_values(self.cursor, """
+            INSERT INTO article_to_event (article_id, event_id) VALUES %s
+            ON CONFLICT (article_id, event_id) DO NOTHING
+        """, links, page_size=self.page_size)
+
+        profiles = []
+        for event, _, profile in groups:
+            if profile is not None:
+                profile.event_id = event.id
+                profiles.append(profile)
+        if profiles:
+            self.topic_repository._upsert_event_profiles(self.cursor, profiles)
+        return [event.id for event, _, _ in groups]
+
+
+    def link_duplicates_to_events(self) -> int:
+        """Add near-duplicate articles to the events of their original articles."""
+        return self.topic_repository._link_duplicates_to_events(self.cursor)
+
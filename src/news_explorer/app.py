@@ -1,6 +1,9 @@
-from flask import Flask, render_template, redirect, request, jsonify, url_for
+from flask import Flask, Response, render_template, redirect, request, jsonify, url_for
+from datetime import datetime
+import json
 import sys
 import os
+from news_db.db_config import DatabaseConfig
 from news_db.news_repository import NewsRepository
 from news_explorer.topic_service import TopicService
 
@@ -8,21 +11,177 @@ from news_explorer.topic_service import TopicService
 app = Flask(__name__)
 topic_service = TopicService()
 
+EVENT_ARTICLE_PREVIEW_LENGTH = 500
+ARTICLES_PAGE_SIZE = 50
+EVENTS_PAGE_SIZE = 20
+SEARCH_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 500
+
 
 @app.route('/')
 def index():
     return redirect('/articles')
 
 
-@app.route('/articles')
-def articles():
-    news_repository = NewsRepository()
-    articles = news_repository.get_all_articles_sorted_by_date()
-    
+def format_dates(articles):
     for article in articles:
         article.formatted_date = article.publication_date.strftime('%Y-%m-%d %H:%M:%S')
-    
-    return render_template('index.html', articles=articles)
+        yield article
+
+
+def parse_page_args(default_limit):
+    """Разбирает параметры размера страницы и фильтров запроса"""
+    def parse_date(name):
+        value = request.args.get(name)
+        return datetime.fromisoformat(value) if value else None
+
+    return {
+        'limit': max(1, min(request.args.get('limit', default_limit, type=int), MAX_PAGE_SIZE)),
+        'date_from': parse_date('date_from'),
+        'date_to': parse_date('date_to'),
+        'source_ids': request.args.getlist('source_id', type=int) or None
+    }
+
+
+def next_page_url(endpoint, **cursor):
+    """Ссылка на следующую страницу с теми же фильтрами"""
+    args = request.args.to_dict(flat=False)
+    args.update(cursor)
+    return url_for(endpoint, **args)
+
+
+def get_articles_page():
+    page_args = parse_page_args(ARTICLES_PAGE_SIZE)
+    before_date = request.args.get('before_date')
+    articles = NewsRepository().get_articles_page(
+        before_date=datetime.fromisoformat(before_date) if before_date else None,
+        before_id=request.args.get('before_id', type=int),
+        **page_args
+    )
+    next_cursor = None
+    if len(articles) == page_args['limit']:
+        next_cursor = {'before_date': articles[-1].publication_date.isoformat(), 'before_id': articles[-1].id}
+    return articles, next_cursor
+
+
+def get_events_page(preview_length):
+    page_args = parse_page_args(EVENTS_PAGE_SIZE)
+    events_data = topic_service.get_events_with_details(
+        preview_length=preview_length,
+        before_id=request.args.get('before_id', type=int),
+        **page_args
+    )
+    next_cursor = None
+    if len(events_data) == page_args['limit']:
+        next_cursor = {'before_id': events_data[-1][0].id}
+    return events_data, next_cursor
+
+
+def stream_json(key, items, next_url, extra=None):
+    """Отдает JSON со списком объектов по частям, не собирая весь ответ в памяти"""
+    def generate():
+        yield '{"%s": [' % key
+        for i, item in enumerate(items):
+            yield (',' if i else '') + json.dumps(item, ensure_ascii=False)
+        yield '], "next": %s' % json.dumps(next_url)
+        for name, value in (extra or {}).items():
+            yield ', "%s": %s' % (name, json.dumps(value, ensure_ascii=False))
+        yield '}'
+    return Response(generate(), mimetype='application/json')
+
+
+def article_to_json(article):
+    return {
+        'id': article.id,
+        'name': article.name,
+        'text': article.text,
+        'publication_date': article.publication_date.isoformat(),
+        'source_id': article.source_id
+    }
+
+
+@app.route('/articles')
+def articles():
+    try:
+        articles, next_cursor = get_articles_page()
+    except ValueError:
+        return 'Некорректные параметры запроса', 400
+    next_url = next_page_url('articles', **next_cursor) if next_cursor else None
+    return render_template('index.html', articles=list(format_dates(articles)), next_url=next_url)
+
+
+@app.route('/api/articles')
+def api_articles():
+    """REST метод для постраничного получения статей"""
+    try:
+        articles, next_cursor = get_articles_page()
+    except ValueError:
+        return jsonify({'error': 'Некорректные параметры запроса'}), 400
+    next_url = next_page_url('api_articles', **next_cursor) if next_cursor else None
+    return stream_json('articles', map(article_to_json, articles), next_url)
+
+
+@app.route('/api/articles/search')
+def api_search_articles():
+    """REST метод для полнотекстового поиска статей, подходит для подсказок при вводе"""
+    text = request.args.get('q', '').strip()
+    if not text:
+        return jsonify({'error': 'Не задан текст поиска'}), 400
+    try:
+        page_args = parse_page_args(SEARCH_PAGE_SIZE)
+        results, max_id, truncated = NewsRepository().search_articles(
+            text,
+            before_rank=request.args.get('before_rank', type=float),
+            before_id=request.args.get('before_id', type=int),
+            max_id=request.args.get('max_id', type=int),
+            exclude_duplicates=True,
+            **page_args
+        )
+    except ValueError:
+        return jsonify({'error': 'Некорректные параметры запроса'}), 400
+    next_url = None
+    if len(results) == page_args['limit']:
+        last_article, _, last_rank = results[-1]
+        next_url = next_page_url('api_search_articles', before_rank=repr(last_rank), before_id=last_article.id,
+                                 max_id=max_id)
+    articles = (
+        {
+            'id': article.id,
+            'name': article.name,
+            'publication_date': article.publication_date.isoformat(),
+            'snippet': snippet
+        }
+        for article, snippet, _ in results
+    )
+    # ранжируются только самые новые совпадения, об этом сообщается в интерфейсе
+    return stream_json('articles', articles, next_url, {'truncated': truncated})
+
+
+@app.route('/api/events')
+def api_events():
+    """REST метод для постраничного получения событий"""
+    try:
+        events_data, next_cursor = get_events_page(request.args.get('preview_length', EVENT_ARTICLE_PREVIEW_LENGTH, type=int))
+    except ValueError:
+        return jsonify({'error': 'Некорректные параметры запроса'}), 400
+    next_url = next_page_url('api_events', **next_cursor) if next_cursor else None
+    events = (
+        {
+            'id': event.id,
+            'name': event.name,
+            'summary': event.summary,
+            'topic': {'id': topic.id, 'name': topic.name} if topic.id else None,
+            'articles': [article_to_json(article) for article in articles]
+        }
+        for event, topic, articles in events_data
+    )
+    return stream_json('events', events, next_url)
+
+
+@app.route('/api/db/pool')
+def db_pool_stats():
+    """Статистика пула соединений с базой данных"""
+    return jsonify(DatabaseConfig().get_pool().stats())
 
 
 @app.route('/api/topics', methods=['POST'])
@@ -81,14 +240,18 @@ def add_article_to_event(event_id):
 @app.route('/events')
 def events_page():
     """Страница для отображения событий"""
-    events_data = topic_service.get_events_with_details()
+    try:
+        events_data, next_cursor = get_events_page(EVENT_ARTICLE_PREVIEW_LENGTH)
+    except ValueError:
+        return 'Некорректные параметры запроса', 400
     
     # Форматируем даты для отображения
     for _, _, articles in events_data:
         for article in articles:
             article.formatted_date = article.publication_date.strftime('%Y-%m-%d %H:%M:%S')
     
-    return render_template('events.html', events_data=events_data)
+    next_url = next_page_url('events_page', **next_cursor) if next_cursor else None
+    return render_template('events.html', events_data=events_data, next_url=next_url)
 
 
 @app.route('/topics')
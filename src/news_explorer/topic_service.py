@@ -45,14 +45,25 @@ class TopicService:
         return event_id
     
 
-    def get_events_with_details(self):
+    def get_events_with_details(self, preview_length=None, limit=None, before_id=None,
+                                date_from=None, date_to=None, source_ids=None):
         """
-        Получает все события с информацией о топиках и связанных статьях
+        Получает события с информацией о топиках и связанных статьях, новые события первыми
         
+        Args:
+            preview_length (int, optional): Длина превью текста статей вместо полного текста
+            limit (int, optional): Максимальное количество событий
+            before_id (int, optional): ID последнего события предыдущей страницы
+            date_from (datetime, optional): Только события со статьями, опубликованными не раньше этой даты
+            date_to (datetime, optional): Только события со статьями, опубликованными раньше этой даты
+            source_ids (list, optional): Только события со статьями из этих источников
+
         Returns:
             list: Список кортежей (event, topic, articles)
         """
-        return self.topic_repository.get_events_with_topic_and_articles()
+        return self.topic_repository.get_events_with_topic_and_articles(
+            preview_length, limit, before_id, date_from, date_to, source_ids
+        )
     
 
     def get_all_topic(self):
@@ -1,5 +1,37 @@
-from news_fetching import telegram_fetcher
+import argparse
+import asyncio
+from news_fetching import telegram_fetcher, async_telegram_fetcher, telegram_daemon, rss_fetcher
+from news_aggregator.near_duplicates import link_near_duplicates
+from news_db.news_repository import NewsRepository
 from datetime import UTC, datetime, timedelta
 
 if  __name__ == "__main__":
-    telegram_fetcher.fetch_earlier_messages(datetime.now(tz=UTC) - timedelta(hours=8))
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--catch-up', action='store_true', help='fetch only messages published since the previous run')
+    parser.add_argument('--rss', action='store_true', help='poll the feeds of RSS sources')
+    parser.add_argument('--daemon', action='store_true', help='keep running and save new messages as they arrive')
+    parser.add_argument('--notify-channel', help='postgres NOTIFY channel for IDs of new articles in the daemon mode')
+    parser.add_argument('--concurrent', action='store_true', help='fetch all sources concurrently')
+    parser.add_argument('--max-concurrency', type=int, default=4, help='requests in flight across all sources')
+    parser.add_argument('--per-source-concurrency', type=int, default=1, help='date ranges of one source fetched at once')
+    args = parser.parse_args()
+    earliest_date = datetime.now(tz=UTC) - timedelta(hours=8)
+
+    if args.rss:
+        rss_fetcher.fetch_rss_sources()
+    elif args.daemon:
+        asyncio.run(telegram_daemon.run_daemon(notify_channel=args.notify_channel))
+    elif args.catch_up:
+        telegram_fetcher.fetch_new_messages(earliest_date)
+    elif args.concurrent:
+        asyncio.run(async_telegram_fetcher.fetch_earlier_messages(
+            earliest_date,
+            max_concurrency=args.max_concurrency,
+            per_source_concurrency=args.per_source_concurrency
+        ))
+    else:
+        telegram_fetcher.fetch_earlier_messages(earliest_date)
+
+    if not args.daemon:
+        signed_count, duplicate_count = link_near_duplicates(NewsRepository())
+        print(f"{signed_count} new articles, {duplicate_count} near duplicates")
@@ -0,0 +1,189 @@
+import asyncio
+import random
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Dict, List
+from telethon.errors import FloodWaitError
+from news_db.news_repository import NewsRepository
+from news_db.model import Source
+from news_fetching.telegram_fetcher import get_tg_client, message_to_article
+
+
+def whole_second(date: datetime, up: bool = False) -> datetime:
+    """Round a date down, or up, to a whole second, Telegram truncates offset_date to seconds."""
+    floor = date.replace(microsecond=0)
+    return floor + timedelta(seconds=1) if up and floor != date else floor
+
+
+class AsyncTelegramFetcher:
+    def __init__(self, client, news_repository: NewsRepository, earliest_date: datetime, batch_size: int = 100,
+                 max_concurrency: int = 4, per_source_concurrency: int = 1, queue_size: int = 50,
+                 write_batch_size: int = 500, max_retries: int = 5):
+        """
+        Fetch messages of all Telegram sources concurrently and save them with batched inserts.
+
+        Every source is split into per_source_concurrency date ranges which are paged
+        backwards independently. Pages are put into a bounded queue, so fetching is paused
+        while the database writer is behind.
+
+        Args:
+            client: Started Telegram client, anything with async get_input_entity and iter_messages
+            news_repository (NewsRepository): Repository to save articles and sources with
+            earliest_date (datetime): Messages published before this date are not fetched
+            batch_size (int, optional): Number of messages in one request
+            max_concurrency (int, optional): Maximum number of requests in flight across all sources
+            per_source_concurrency (int, optional): Number of date ranges of one source fetched at once
+            queue_size (int, optional): Maximum number of pages waiting for the database writer
+            write_batch_size (int, optional): Number of articles inserted at once
+            max_retries (int, optional): Number of retries of a failed request
+        """
+        self.client = client
+        self.news_repository = news_repository
+        self.earliest_date = earliest_date
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.per_source_concurrency = per_source_concurrency
+        self.queue_size = queue_size
+        self.write_batch_size = write_batch_size
+        self.max_retries = max_retries
+        self.stats = {}
+        self._resume_at = 0.0
+
+
+    async def run(self) -> Dict[str, dict]:
+        """
+        Fetch and save messages of all sources with a Telegram channel.
+
+        Returns:
+            Dict[str, dict]: Number of messages, articles, seconds and messages/sec per source name
+        """
+        self._requests = asyncio.Semaphore(self.max_concurrency)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        sources = await asyncio.to_thread(self.news_repository.get_sources)
+        writer = asyncio.create_task(self._write())
+        fetchers = asyncio.gather(*(self._fetch_source(source) for source in sources if source.tg_channel))
+        try:
+            # The writer only finishes before the fetchers if it failed
+            done, _ = await asyncio.wait({writer, fetchers}, return_when=asyncio.FIRST_COMPLETED)
+            if writer in done:
+                writer.result()
+            await fetchers
+            await self._queue.put(None)
+            await writer
+        finally:
+            fetchers.cancel()
+            writer.cancel()
+        return self.stats
+
+
+    async def _fetch_source(self, source: Source):
+        started = time.monotonic()
+        self.stats[source.name] = {"messages": 0, "articles": 0}
+        end = source.earliest_publication_date.replace(tzinfo=UTC) if source.earliest_publication_date else datetime.now(tz=UTC)
+        # range bounds are whole seconds, so a truncated offset_date does not drop the messages
+        # of a bound second from both neighbouring ranges
+        start, end = whole_second(self.earliest_date), whole_second(end, up=True)
+        if end > start:
+            channel = await self._request(self.client.get_input_entity, source.tg_channel)
+            step = (end - start) / self.per_source_concurrency
+            bounds = [whole_second(start + step * k) for k in range(self.per_source_concurrency)] + [end]
+            await asyncio.gather(*(
+                self._fetch_range(source, channel, bounds[k], bounds[k + 1])
+                for k in range(self.per_source_concurrency)
+            ))
+        seconds = time.monotonic() - started
+        stats = self.stats[source.name]
+        stats["seconds"] = seconds
+        stats["messages_per_second"] = stats["messages"] / seconds if seconds > 0 else 0.0
+        print(f"{source.name}: {stats['messages']} messages in {seconds:.1f}s, {stats['messages_per_second']:.1f} messages/sec")
+        await self._queue.put((source, None))
+
+
+    async def _fetch_range(self, source: Source, channel, start: datetime, end: datetime):
+        # the first page starts at the end of the range, the next ones at the last message seen;
+        # offset_date has a resolution of one second, so paging by it skips messages sent within the same second
+        offset_id = 0
+        while True:
+            messages = await self._request(self._get_page, channel, end, offset_id)
+            in_range = [message for message in messages if message.date >= start]
+            self.stats[source.name]["messages"] += len(in_range)
+            articles = [article for article in (message_to_article(self.earliest_date, source, message) for message in in_range) if article]
+            if articles:
+                self.stats[source.name]["articles"] += len(articles)
+                await self._queue.put((source, articles))
+            if len(in_range) < self.batch_size:
+                return
+            offset_id = messages[-1].id
+
+
+    async def _get_page(self, channel, offset_date: datetime, offset_id: int) -> list:
+        if offset_id:
+            return [message async for message in self.client.iter_messages(channel, limit=self.batch_size, offset_id=offset_id)]
+        return [message async for message in self.client.iter_messages(channel, limit=self.batch_size, offset_date=offset_date)]
+
+
+    async def _request(self, request, *args):
+        """Run a Telegram request within the global limit, waiting out FloodWait and retrying with backoff."""
+        for attempt in range(self.max_retries + 1):
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                async with self._requests:
+                    return await request(*args)
+            except FloodWaitError as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"Flood wait for {e.seconds}s")
+                # FloodWait is per account, so all requests are paused
+                self._resume_at = max(self._resume_at, time.monotonic() + e.seconds)
+            except (ConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"Error fetching messages: {e}")
+                await asyncio.sleep(min(2 ** attempt, 60) * random.uniform(0.5, 1.5))
+
+
+    async def _write(self):
+        pending = []
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                break
+            source, articles = item
+            if articles is None:
+                await self._flush(pending)
+                await asyncio.to_thread(self.news_repository.update_source, source)
+                continue
+            pending.extend(articles)
+            if len(pending) >= self.write_batch_size or self._queue.empty():
+                await self._flush(pending)
+        await self._flush(pending)
+
+
+    async def _flush(self, articles: List):
+        if not articles:
+            return
+        article_ids = await asyncio.to_thread(self.news_repository.add_articles, list(articles))
+        print(f"Saved {len(article_ids)} of {len(articles)} articles")
+        articles.clear()
+
+
+async def fetch_earlier_messages(earliest_date: datetime, news_repository: NewsRepository = None, client=None, **options) -> Dict[str, dict]:
+    """
+    Fetch messages of all sources concurrently.
+
+    Args:
+        earliest_date (datetime): Messages published before this date are not fetched
+        news_repository (NewsRepository, optional): Repository to save articles with
+        client (optional): Telegram client, a new Telethon client is started if not given
+        **options: Options of AsyncTelegramFetcher
+
+    Returns:
+        Dict[str, dict]: Statistics per source name
+    """
+    news_repository = news_repository or NewsRepository()
+    if client is not None:
+        return await AsyncTelegramFetcher(client, news_repository, earliest_date, **options).run()
+    async with get_tg_client() as client:
+        return await AsyncTelegramFetcher(client, news_repository, earliest_date, **options).run()
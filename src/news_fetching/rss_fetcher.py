@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import UTC
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+from requests import Session
+from requests.adapters import HTTPAdapter
+from rss_parser import RSSParser
+from news_db.news_repository import NewsRepository
+from news_db.model import Article, Source
+from news_aggregator.text_cleaning import clean_text
+
+
+def fetch_rss_sources(news_repository: NewsRepository = NewsRepository(), max_workers: int = 8, timeout: float = 30.0):
+    """
+    Poll the feeds of all RSS sources concurrently and save new items.
+
+    Feeds are requested with the ETag and Last-Modified of the previous response,
+    so unchanged feeds are answered with 304 and not parsed.
+
+    Args:
+        news_repository (NewsRepository, optional): Repository to save articles with
+        max_workers (int, optional): Number of feeds polled at once
+        timeout (float, optional): Timeout of one request in seconds
+    """
+    sources = [source for source in news_repository.get_sources() if source.rss_url]
+    with create_session(max_workers) as session, ThreadPoolExecutor(max_workers) as executor:
+        futures = {executor.submit(fetch_feed, session, source, timeout): source for source in sources}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                articles = future.result()
+            except Exception as e:
+                print(f"Error fetching feed {source.rss_url}: {e}")
+                continue
+            if articles is None:
+                print(f"{source.name}: not modified")
+                continue
+            article_ids = news_repository.save_fetched_articles(source, articles)
+            print(f"{source.name}: {len(article_ids)} new of {len(articles)} items")
+
+
+def create_session(pool_size: int) -> Session:
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_feed(session: Session, source: Source, timeout: float = 30.0) -> Optional[List[Article]]:
+    """
+    Download and parse the feed of a source.
+
+    The validators and publication dates of the source are updated in place, they are
+    saved together with the articles. Items with a date which can not be parsed are skipped.
+
+    Args:
+        session (Session): HTTP session
+        source (Source): Source with rss_url
+        timeout (float, optional): Timeout of the request in seconds
+
+    Returns:
+        Optional[List[Article]]: Articles of the feed items, None if the feed is not modified
+    """
+    headers = {}
+    if source.rss_etag:
+        headers['If-None-Match'] = source.rss_etag
+    if source.rss_last_modified:
+        headers['If-Modified-Since'] = source.rss_last_modified
+    response = session.get(source.rss_url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+
+    rss = RSSParser.parse(response.text)
+    articles = []
+    for item in rss.channel.items:
+        # a malformed item is skipped, the rest of the feed is still saved
+        try:
+            article = item_to_article(source, item)
+        except (TypeError, ValueError) as e:
+            print(f"Skipping item of feed {source.rss_url}: {e}")
+            continue
+        if article:
+            articles.append(article)
+    source.rss_etag = response.headers.get('ETag')
+    source.rss_last_modified = response.headers.get('Last-Modified')
+    return articles
+
+
+def item_to_article(source: Source, item) -> Article:
+    if not item.pub_date or not (item.title or item.description):
+        return None
+    publication_date = parsedate_to_datetime(item.pub_date.content).astimezone(UTC)
+    title = item.title.content if item.title else source.name
+    text = item.description.content if item.description else title
+    article = Article(
+                id=None,
+                name=title,
+                text=text,
+                publication_date=publication_date,
+                source_id=source.id,
+                clean_text=clean_text(text)
+            )
+    source.add_publication_date(publication_date)
+    return article
@@ -0,0 +1,155 @@
+import asyncio
+from datetime import UTC, datetime
+from typing import Dict, List
+from telethon import events, utils
+from news_db.news_repository import NewsRepository
+from news_fetching.telegram_fetcher import get_tg_client, message_to_article
+from news_aggregator.near_duplicates import NearDuplicateDetector, link_near_duplicates
+
+
+class TelegramIngestDaemon:
+    def __init__(self, client, news_repository: NewsRepository, batch_size: int = 100, flush_interval: float = 2.0,
+                 notify_channel: str = None, article_queue: asyncio.Queue = None, queue_size: int = 10000,
+                 max_retries: int = 5):
+        """
+        Save new messages of all Telegram sources as they arrive, keeping one client session open.
+
+        Messages are collected into micro-batches of up to batch_size messages or
+        flush_interval seconds and saved together with the source checkpoints. A batch which
+        fails to be saved is retried with backoff; when the retries are exhausted the client
+        is disconnected, so the daemon stops instead of receiving messages it can not save.
+
+        Args:
+            client: Started Telethon client
+            news_repository (NewsRepository): Repository to save articles with
+            batch_size (int, optional): Maximum number of messages saved at once
+            flush_interval (float, optional): Maximum number of seconds a message waits to be saved
+            notify_channel (str, optional): Postgres NOTIFY channel to send new article IDs to
+            article_queue (asyncio.Queue, optional): In-process queue to put lists of new article IDs to
+            queue_size (int, optional): Maximum number of received messages waiting to be saved,
+                receiving waits while the queue is full
+            max_retries (int, optional): Number of retries of a batch which failed to be saved
+        """
+        self.client = client
+        self.news_repository = news_repository
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.notify_channel = notify_channel
+        self.article_queue = article_queue
+        self.max_retries = max_retries
+        self.sources_by_chat = {}
+        self.detector = NearDuplicateDetector()
+        self._queue = asyncio.Queue(maxsize=queue_size)
+
+
+    async def run(self):
+        """Subscribe to new messages of all sources and save them until the client disconnects."""
+        sources = await asyncio.to_thread(self.news_repository.get_sources)
+        for source in sources:
+            if source.tg_channel:
+                channel = await self.client.get_input_entity(source.tg_channel)
+                self.sources_by_chat[utils.get_peer_id(channel)] = source
+        print(f"Listening to {len(self.sources_by_chat)} channels")
+
+        self.client.add_event_handler(self._on_message, events.NewMessage(chats=list(self.sources_by_chat)))
+        writer = asyncio.create_task(self._write())
+        try:
+            await self.client.run_until_disconnected()
+        finally:
+            self.client.remove_event_handler(self._on_message)
+            if not writer.done():
+                await self._queue.put(None)
+            await writer
+
+
+    async def _on_message(self, event):
+        source = self.sources_by_chat.get(event.chat_id)
+        if source is not None:
+            await self._queue.put((source, event.message))
+
+
+    async def _write(self):
+        try:
+            await self._write_batches()
+        except Exception as e:
+            print(f"Error saving messages, stopping the daemon: {e}")
+            await self.client.disconnect()
+            raise
+
+
+    async def _write_batches(self):
+        loop = asyncio.get_running_loop()
+        stopped = False
+        while not stopped:
+            batch = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                if deadline is None:
+                    item = await self._queue.get()
+                    deadline = loop.time() + self.flush_interval
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                # None is put by run() when the client disconnects
+                if item is None:
+                    stopped = True
+                    break
+                batch.append(item)
+            await self._save_with_retries(batch)
+
+
+    async def _save_with_retries(self, batch: list):
+        # articles are inserted with ON CONFLICT DO NOTHING, so a partly saved batch can be saved again
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._save(batch)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = min(2 ** attempt, 60)
+                print(f"Error saving {len(batch)} messages, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+
+
+    async def _save(self, batch: list):
+        if not batch:
+            return
+        messages_by_source: Dict[int, List] = {}
+        sources = {}
+        for source, message in batch:
+            messages_by_source.setdefault(source.id, []).append(message)
+            sources[source.id] = source
+
+        for source_id, messages in messages_by_source.items():
+            source = sources[source_id]
+            articles = [article for article in (message_to_article(datetime.min.replace(tzinfo=UTC), source, message) for message in messages) if article]
+            source.latest_message_id = max(source.latest_message_id or 0, *(message.id for message in messages))
+            article_ids = await asyncio.to_thread(self.news_repository.save_fetched_articles, source, articles,
+                                                  notify_channel=self.notify_channel)
+            print(f"{source.name}: {len(article_ids)} new articles")
+            if article_ids and self.article_queue is not None:
+                self.article_queue.put_nowait(article_ids)
+        await asyncio.to_thread(link_near_duplicates, self.news_repository, self.detector)
+
+
+async def run_daemon(news_repository: NewsRepository = None, client=None, **options):
+    """
+    Run the ingest daemon until the client disconnects.
+
+    Args:
+        news_repository (NewsRepository, optional): Repository to save articles with
+        client (optional): Telethon client, a new one is started if not given
+        **options: Options of TelegramIngestDaemon
+    """
+    news_repository = news_repository or NewsRepository()
+    if client is not None:
+        await TelegramIngestDaemon(client, news_repository, **options).run()
+        return
+    async with get_tg_client() as client:
+        await TelegramIngestDaemon(client, news_repository, **options).run()
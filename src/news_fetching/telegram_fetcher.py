@@ -1,18 +1,63 @@
 import os
 from news_db.news_repository import NewsRepository
 from news_db.model import Article, Source
+from news_aggregator.text_cleaning import clean_text
 from dotenv import load_dotenv
 from telethon.sync import TelegramClient
-from datetime import datetime
+from datetime import UTC, datetime
 import markdown
 
 
 def fetch_earlier_messages(earliest_date: datetime, news_repository: NewsRepository = NewsRepository(), batch_size: int = 20):
-    client = __get_tg_client()
+    client = get_tg_client()
     __fetch_and_save_messages_for_sources(earliest_date, news_repository, batch_size, client)
 
 
-def __get_tg_client():
+def fetch_new_messages(earliest_date: datetime, news_repository: NewsRepository = NewsRepository(), batch_size: int = 100):
+    """
+    Fetch messages published since the previous run of every source, oldest first.
+
+    Each batch is saved together with the source checkpoint, so a crashed run
+    continues from the last saved batch.
+
+    Args:
+        earliest_date (datetime): Start of the fetch for sources without a checkpoint
+        news_repository (NewsRepository, optional): Repository to save articles with
+        batch_size (int, optional): Number of messages in one request
+    """
+    client = get_tg_client()
+    sources = news_repository.get_sources()
+    with client:
+        for source in sources:
+            if source.tg_channel:
+                __catch_up_source(earliest_date, news_repository, source, client, batch_size)
+
+
+def __catch_up_source(earliest_date: datetime, news_repository: NewsRepository, source: Source, client: TelegramClient, batch_size):
+    channel = client.get_input_entity(source.tg_channel)
+    # a source with a checkpoint continues from it however long ago it was saved,
+    # earliest_date only limits the first fetch of a new source
+    if source.latest_message_id:
+        earliest_date = datetime.min.replace(tzinfo=UTC)
+    while True:
+        if source.latest_message_id:
+            checkpoint = {'min_id': source.latest_message_id}
+        else:
+            checkpoint = {'offset_date': source.latest_publication_date.replace(tzinfo=UTC) if source.latest_publication_date else earliest_date}
+        messages = list(client.iter_messages(channel, limit=batch_size, reverse=True, **checkpoint))
+        handled = [message for message in messages if message.date >= earliest_date]
+        if not handled:
+            return
+        articles = [article for article in (message_to_article(earliest_date, source, message) for message in handled) if article]
+        # messages without text advance the checkpoint too
+        source.latest_message_id = max(message.id for message in handled)
+        article_ids = news_repository.save_fetched_articles(source, articles)
+        print(f"{source.name}: {len(article_ids)} new articles up to message {source.latest_message_id}")
+        if len(messages) < batch_size:
+            return
+
+
+def get_tg_client():
     load_dotenv('.env')
     TELEGRAM_API_ID = int(os.getenv('TELEGRAM_API_ID'))
     TELEGRAM_API_HASH = os.getenv('TELEGRAM_API_HASH')
@@ -36,35 +81,28 @@ def __process_source(earliest_date: datetime, news_repository, source, client: T
     channel = client.get_input_entity(tg_channel_alias)
     message_count = 1
     while message_count > 0:
-        message_count = 0
         messages = client.iter_messages(channel, limit=batch_size, offset_date=source.earliest_publication_date)
-        for message in messages:
-            message_count += process_message(earliest_date, news_repository, source, message)
+        articles = [article for article in (message_to_article(earliest_date, source, message) for message in messages) if article]
+        article_ids = news_repository.add_articles(articles)
+        print(article_ids)
+        message_count = len(article_ids)
     news_repository.update_source(source)
 
 
-def process_message(earliest_date: datetime, news_repository, source: Source, message) -> int:
+def message_to_article(earliest_date: datetime, source: Source, message) -> Article:
     if message.text:
         if message.date < earliest_date:
-            return 0
+            return None
         print(message.date)
+        text = markdown.markdown(message.text)
         article = Article(
                     id=None,
                     name=source.name,
-                    text=markdown.markdown(message.text),
+                    text=text,
                     publication_date=message.date,
-                    source_id=source.id
+                    source_id=source.id,
+                    clean_text=clean_text(text)
                 )
-        __add_date_for_source(source, message.date)
-        id = news_repository.add_article(article)
-        print(id)
-        return 1 if id else 0
-    return 0
-
-
-def __add_date_for_source(source: Source, date: datetime):
-    date = date.replace(tzinfo=None)
-    if not source.latest_publication_date or date > source.latest_publication_date:
-        source.latest_publication_date = date
-    if not source.earliest_publication_date or date < source.earliest_publication_date:
-        source.earliest_publication_date = date
+        source.add_publication_date(message.date, message.id)
+        return article
+    return None
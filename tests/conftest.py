@@ -0,0 +1,6 @@
+import os
+import sys
+
+
+# the packages are run from src without being installed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
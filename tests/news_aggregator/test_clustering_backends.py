@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from news_aggregator.clustering_backends import DBSCANBackend, GreedyBackend, group_articles
+from news_aggregator.nlp_pipeline import ArticleFeatures
+
+
+def baseline_group_articles(news_features):
+    """Greedy grouping as it was done before candidate generation: every pair is scored."""
+    counts = {}
+    for features in news_features:
+        for lemma in set(features.entities):
+            counts[lemma] = counts.get(lemma, 0) + 1
+
+    def ner_similarity(first, second):
+        first, second = set(first), set(second)
+        total = sum(1 / counts[lemma] for lemma in first | second)
+        if total == 0:
+            return 0
+        similarity = 0
+        for lemma1 in first:
+            for lemma2 in second:
+                if lemma1 in lemma2 or lemma2 in lemma1:
+                    similarity += 1 / counts[lemma1]
+                    if lemma1 != lemma2:
+                        similarity += 1 / counts[lemma2]
+                    break
+        return similarity / total
+
+    def vector_similarity(first, second):
+        return float(first @ second / (np.linalg.norm(first) * np.linalg.norm(second)))
+
+    grouped = set()
+    groups = []
+    for i, features in enumerate(news_features):
+        if i in grouped:
+            continue
+        grouped.add(i)
+        group = [i]
+        for j in range(i + 1, len(news_features)):
+            if j in grouped:
+                continue
+            vector = vector_similarity(features.vector, news_features[j].vector)
+            ner = ner_similarity(features.entities, news_features[j].entities)
+            if vector > 0.95 and ner > 0.2 or ner > 0.8:
+                grouped.add(j)
+                group.append(j)
+        groups.append(group)
+    return groups
+
+
+def features(vector, entities):
+    return ArticleFeatures(np.asarray(vector, dtype=np.float32), entities)
+
+
+# labelled articles, newest first, with the expected groups: 2 and 3 match 0 by vector and
+# entities, 2 only through the alias 'путин' of 'владимир путин', 4 by entities alone,
+# 7 has a close vector to 6 but no entities
+LABELLED = [
+    features([1, 0, 0], ['москва', 'путин', 'саммит']),
+    features([0, 1, 0], ['газпром', 'европа']),
+    features([0.99, 0.1, 0], ['москва', 'владимир путин', 'саммит', 'кремль']),
+    features([1, 0.02, 0], ['москва']),
+    features([0, 0, 1], ['москва', 'путин', 'саммит']),
+    features([0.05, 1, 0], ['газпром', 'европа', 'газ']),
+    features([0, 0.3, 1], ['спартак', 'цска']),
+    features([0, 0, 1], []),
+    features([0, 0.28, 1], ['спартак', 'цска', 'лужники']),
+]
+LABELLED_GROUPS = [[0, 2, 3, 4], [1, 5], [6, 8], [7]]
+
+
+# every entity is in two articles, so all weights are equal and similarities are exact fractions
+TIES = [
+    # NER similarity exactly 0.2 with equal vectors: 0.2 is not above the threshold
+    [
+        features([1, 0], ['a', 'b', 'c']),
+        features([1, 0], ['a', 'd', 'e']),
+        features([0, 1], ['b', 'c', 'd', 'e']),
+    ],
+    # NER similarity exactly 0.8 with different vectors: 0.8 is not above the strong threshold
+    [
+        features([1, 0], ['a', 'b', 'c', 'd']),
+        features([0, 1], ['a', 'b', 'c', 'd', 'e']),
+        features([-1, 0], ['e']),
+    ],
+]
+
+
+def test_empty_input():
+    assert group_articles([]) == []
+    assert GreedyBackend().group([]) == []
+    assert DBSCANBackend().group([]) == []
+
+
+def test_groups_match_baseline_on_labelled_articles():
+    assert baseline_group_articles(LABELLED) == LABELLED_GROUPS
+    assert group_articles(LABELLED) == LABELLED_GROUPS
+    assert GreedyBackend(block_size=2, tile_size=3).group(LABELLED) == LABELLED_GROUPS
+
+
+@pytest.mark.parametrize('news_features', TIES)
+def test_ties_at_thresholds_match_baseline(news_features):
+    assert baseline_group_articles(news_features) == [[0], [1], [2]]
+    assert group_articles(news_features) == [[0], [1], [2]]
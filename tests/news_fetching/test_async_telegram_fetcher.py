@@ -0,0 +1,70 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from news_db.model import Source
+from news_fetching import async_telegram_fetcher
+from news_fetching.async_telegram_fetcher import fetch_earlier_messages
+
+
+NOW = datetime(2025, 1, 10, 12, 0, 0, 600000, tzinfo=UTC)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+class FakeClient:
+    def __init__(self, messages):
+        self.messages = sorted(messages, key=lambda message: message.id, reverse=True)
+
+    async def get_input_entity(self, alias):
+        return alias
+
+    async def iter_messages(self, channel, limit, offset_date=None, offset_id=0):
+        # as Telegram, offset_date is truncated to seconds and both offsets are exclusive
+        if offset_id:
+            messages = [message for message in self.messages if message.id < offset_id]
+        else:
+            offset_date = offset_date.replace(microsecond=0)
+            messages = [message for message in self.messages if message.date < offset_date]
+        for message in messages[:limit]:
+            yield message
+
+
+class FakeRepository:
+    def __init__(self, sources):
+        self.sources = sources
+        self.articles = []
+
+    def get_sources(self):
+        return self.sources
+
+    def add_articles(self, articles):
+        self.articles.extend(articles)
+        return list(range(len(articles)))
+
+    def update_source(self, source):
+        pass
+
+
+@pytest.mark.parametrize('per_source_concurrency', [1, 3, 7])
+def test_ranges_do_not_drop_messages(per_source_concurrency, monkeypatch):
+    monkeypatch.setattr(async_telegram_fetcher, 'datetime', FrozenDatetime)
+    # two messages a second up to the current second, as Telegram dates have no fractions
+    newest = NOW.replace(microsecond=0)
+    messages = [
+        SimpleNamespace(id=1000 - k, text=f"Сообщение {1000 - k}", date=newest - timedelta(seconds=k // 2))
+        for k in range(300)
+    ]
+    source = Source(id=1, key='channel', name='Канал', tg_channel='channel')
+    repository = FakeRepository([source])
+
+    asyncio.run(fetch_earlier_messages(NOW - timedelta(seconds=149.7), repository, client=FakeClient(messages),
+                                       batch_size=7, per_source_concurrency=per_source_concurrency))
+
+    assert sorted(article.clean_text for article in repository.articles) == sorted(message.text for message in messages)
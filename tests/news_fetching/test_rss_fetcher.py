@@ -0,0 +1,104 @@
+import os
+import threading
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from news_db.model import Source
+from news_fetching.rss_fetcher import create_session, fetch_feed
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+ETAG = '"v1"'
+LAST_MODIFIED = 'Wed, 08 Jan 2025 10:00:00 GMT'
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        path = os.path.join(FIXTURES, os.path.basename(self.path))
+        if not os.path.exists(path):
+            self.send_error(404)
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', ETAG)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def feed_url():
+    # port 0 lets the OS pick a free port
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session():
+    with create_session(1) as session:
+        yield session
+
+
+def make_source(url):
+    return Source(id=7, key='feed', name='Лента', rss_url=url)
+
+
+def test_fetch_feed_parses_items(feed_url, session):
+    source = make_source(f"{feed_url}/feed.xml")
+
+    articles = fetch_feed(session, source)
+
+    # the item without a date is skipped
+    assert [article.name for article in articles] == ['Первая новость', 'Вторая новость']
+    assert articles[0].text == '<p>Текст первой новости</p>'
+    assert articles[0].clean_text == 'Текст первой новости'
+    assert articles[0].publication_date == datetime(2025, 1, 6, 7, 0, tzinfo=UTC)
+    assert all(article.source_id == 7 for article in articles)
+    assert source.rss_etag == ETAG
+    assert source.rss_last_modified == LAST_MODIFIED
+
+
+def test_fetch_feed_updates_source_dates(feed_url, session):
+    source = make_source(f"{feed_url}/feed.xml")
+    source.latest_publication_date = datetime(2025, 1, 7, 0, 0)
+    source.earliest_publication_date = datetime(2025, 1, 5, 0, 0)
+
+    fetch_feed(session, source)
+
+    # dates of the source are naive UTC
+    assert source.latest_publication_date == datetime(2025, 1, 7, 12, 30)
+    assert source.earliest_publication_date == datetime(2025, 1, 5, 0, 0)
+
+
+def test_fetch_feed_skips_malformed_item(feed_url, session, capsys):
+    source = make_source(f"{feed_url}/malformed_item.xml")
+
+    articles = fetch_feed(session, source)
+
+    assert [article.name for article in articles] == ['Новость']
+    assert source.latest_publication_date == datetime(2025, 1, 8, 9, 15)
+    assert source.earliest_publication_date == datetime(2025, 1, 8, 9, 15)
+    assert 'Skipping item' in capsys.readouterr().out
+
+
+def test_fetch_feed_not_modified(feed_url, session):
+    source = make_source(f"{feed_url}/feed.xml")
+    source.rss_etag = ETAG
+
+    assert fetch_feed(session, source) is None
@@ -0,0 +1,81 @@
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from news_db.model import Source
+from news_fetching import telegram_fetcher
+
+
+NOW = datetime(2025, 1, 10, 12, 0, tzinfo=UTC)
+
+
+class FakeClient:
+    def __init__(self, messages):
+        self.messages = messages
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def get_input_entity(self, alias):
+        return alias
+
+    def iter_messages(self, channel, limit, reverse=False, min_id=0, offset_date=None):
+        # reverse=True returns messages after the checkpoint, oldest first
+        messages = sorted(self.messages, key=lambda message: message.id)
+        if min_id:
+            messages = [message for message in messages if message.id > min_id]
+        elif offset_date is not None:
+            messages = [message for message in messages if message.date > offset_date]
+        return messages[:limit]
+
+
+class FakeRepository:
+    def __init__(self, sources):
+        self.sources = sources
+        self.articles = []
+        self.checkpoints = []
+
+    def get_sources(self):
+        return self.sources
+
+    def save_fetched_articles(self, source, articles, notify_channel=None):
+        self.articles.extend(articles)
+        self.checkpoints.append(source.latest_message_id)
+        return list(range(len(articles)))
+
+
+def make_messages(first_id, count, newest, interval):
+    return [
+        SimpleNamespace(id=first_id + k, text=f"Сообщение {first_id + k}", date=newest - interval * (count - 1 - k))
+        for k in range(count)
+    ]
+
+
+def test_catch_up_after_gap_longer_than_cutoff(monkeypatch):
+    source = Source(id=1, key='channel', name='Канал', tg_channel='channel', latest_message_id=10,
+                    latest_publication_date=(NOW - timedelta(hours=30)).replace(tzinfo=None))
+    # 30 unseen messages over the last day, most of them older than the cutoff
+    client = FakeClient(make_messages(1, 10, NOW - timedelta(hours=30), timedelta(minutes=1))
+                        + make_messages(11, 30, NOW, timedelta(hours=0.8)))
+    repository = FakeRepository([source])
+    monkeypatch.setattr(telegram_fetcher, 'get_tg_client', lambda: client)
+
+    telegram_fetcher.fetch_new_messages(NOW - timedelta(hours=8), repository, batch_size=7)
+
+    assert [article.clean_text for article in repository.articles] == [f"Сообщение {k}" for k in range(11, 41)]
+    assert source.latest_message_id == 40
+
+
+def test_first_catch_up_starts_at_cutoff(monkeypatch):
+    source = Source(id=1, key='channel', name='Канал', tg_channel='channel')
+    client = FakeClient(make_messages(1, 30, NOW, timedelta(hours=0.8)))
+    repository = FakeRepository([source])
+    monkeypatch.setattr(telegram_fetcher, 'get_tg_client', lambda: client)
+
+    telegram_fetcher.fetch_new_messages(NOW - timedelta(hours=8), repository, batch_size=7)
+
+    assert all(article.publication_date > NOW - timedelta(hours=8) for article in repository.articles)
+    assert len(repository.articles) == 10
+    assert source.latest_message_id == 30